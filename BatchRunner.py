@@ -0,0 +1,255 @@
+from Card import Card
+from CompactHand import CompactHand
+from Table import Table
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+import pandas as pd
+
+class BatchRunner:
+    # Names of the hand levels, lowest first, used as output column names
+    level_columns: list[str] = [name.lower().replace(" ", "_") for name in Table.index_level_pairs.values()]
+
+    def __init__(self, n_samples: int = 10000, seed: int = None, workers: int = None, chunksize: int = 10000,
+                 equity: bool = False, ranges = None):
+        """Analyzes many table states without prompts, streaming them from
+            a CSV or Parquet file and streaming the results to Parquet (or
+            CSV).
+
+        Each input row is a scenario with the columns "player" (the hole
+            cards, such as "AS KD"), "board" (the community cards, such as
+            "QS 7H 2D", or empty) and "opponents" (a number of opponents,
+            or several separated by semicolons, such as "1;2;4"). Cards are
+            read as per Card.parse_many, such as "AS KD" or "ASKD".
+
+        The input is read chunksize rows at a time, each chunk is split
+            across the worker processes, and its results are written before
+            the next chunk is read, so memory use does not depend on the
+            size of the input. Each output row is one scenario and number of
+            opponents, with the columns:
+            row: The scenario's row number in the input, from 0.
+            player, board, opponents: As in the input.
+            player_level: The level of the player's hand on the board.
+            exact: Whether the result is exact rather than sampled.
+            samples: The number of samples, or 0 if exact.
+            win, tie, loss: The probabilities that the player's hand beats,
+                ties or loses to the best opponent hand.
+            equity: The player's expected share of the pot (equity mode
+                only).
+            high_card, ..., straight_flush: The probability that the best
+                opponent hand has each level.
+            error: Why the scenario could not be analyzed, such as a card 
+                that cannot be read, or empty if it was. A scenario with an
+                error gives one row, with the results missing, and the run
+                goes on with the next scenario.
+        By default hands are compared on the board as given, as per
+            Table.probabilities; in equity mode the rest of the board is
+            dealt, as per Table.equity.
+
+        Optional arguments:
+        n_samples (int): The number of samples per analysis. Defaults to
+            10000.
+        seed (int): If given, scenario i is seeded with seed + i, so a run
+            is reproducible whatever the chunk size and number of workers.
+            Defaults to None.
+        workers (int): The number of worker processes. Defaults to None,
+            which analyzes in this process.
+        chunksize (int): The number of input rows held in memory at once.
+            Defaults to 10000.
+        equity (bool): Whether to deal the rest of the board. Defaults to
+            False.
+        ranges (str | list[str]): The opponents' ranges, as per
+            Table.probabilities.
+
+        Instance variables:
+        The optional arguments.
+
+        Methods:
+        read: Reads scenarios in chunks.
+        analyze: Analyzes a chunk of scenarios.
+        run: Analyzes every scenario in a file and writes the results.
+        """
+        if not isinstance(chunksize, int):
+            raise TypeError(f"Optional argument chunksize must be of type int, not {type(chunksize)}")
+        if chunksize < 1:
+            raise ValueError(f"Optional argument chunksize must be at least 1, not {chunksize}")
+        self.n_samples: int = n_samples
+        self.seed: int = seed
+        self.workers: int = workers
+        self.chunksize: int = chunksize
+        self.equity: bool = equity
+        self.ranges = ranges
+
+    def read(self, path: str):
+        """Reads scenarios from a CSV or Parquet file (by extension),
+            chunksize rows at a time.
+
+        Positional arguments:
+        path (str): The input file.
+
+        Returns: A generator of DataFrames with the columns "row", "player",
+            "board" and "opponents", all strings except "row".
+        """
+        row: int = 0
+        if path.lower().endswith((".parquet", ".pq")):
+            import pyarrow.parquet as pq
+            batches = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=self.chunksize))
+        else:
+            batches = pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=self.chunksize)
+        for chunk in batches:
+            chunk = pd.DataFrame({
+                "row": np.arange(row, row + len(chunk)),
+                "player": chunk["player"].astype(str),
+                "board": chunk["board"].fillna("").astype(str) if "board" in chunk else "",
+                "opponents": chunk["opponents"].astype(str),
+            })
+            row += len(chunk)
+            yield chunk
+
+    def analyze(self, scenarios: pd.DataFrame, pool: ProcessPoolExecutor = None) -> pd.DataFrame:
+        """Analyzes a chunk of scenarios, as returned by read.
+
+        Optional arguments:
+        pool (ProcessPoolExecutor): Splits the chunk across this pool's
+            processes. Defaults to None, which analyzes in this process.
+
+        Returns: A DataFrame of results, with the columns described in the
+            class docstring.
+        """
+        rows: list[tuple] = list(scenarios[["row", "player", "board", "opponents"]].itertuples(index=False, name=None))
+        settings: tuple = (self.n_samples, self.seed, self.equity, self.ranges)
+        if pool is None or len(rows) < 2:
+            results: list[dict] = _analyze_rows(rows, settings)
+        else:
+            # A pool passed in may be larger or smaller than self.workers
+            workers: int = getattr(pool, "_max_workers", None) or self.workers or os.cpu_count()
+            size: int = -(-len(rows) // (4*workers))
+            parts = pool.map(_analyze_rows, [rows[i:i+size] for i in range(0, len(rows), size)],
+                             [settings] * len(range(0, len(rows), size)))
+            results = [result for part in parts for result in part]
+        columns: list[str] = ["row", "player", "board", "opponents", "player_level", "exact", "samples",
+                              "win", "tie", "loss"] + (["equity"] if self.equity else []) + self.level_columns \
+            + ["error"]
+        frame: pd.DataFrame = pd.DataFrame(results, columns=columns)
+        # Nullable types keep every chunk's schema the same, whether or not
+        # it has rows with errors
+        frame = frame.astype({"opponents": "Int64", "player_level": "Int64", "exact": "boolean",
+                              "samples": "Int64"})
+        frame["error"] = frame["error"].fillna("")
+        return frame
+
+    def run(self, input_path: str, output_path: str) -> int:
+        """Analyzes every scenario in input_path and writes the results to
+            output_path, as Parquet, or as CSV if it ends in ".csv".
+
+        Returns: The number of scenarios analyzed.
+        """
+        parquet: bool = not output_path.lower().endswith(".csv")
+        if parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        writer = None
+        n_scenarios: int = 0
+        pool: ProcessPoolExecutor = None
+        if self.workers is not None and self.workers > 1:
+            pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            for scenarios in self.read(input_path):
+                results: pd.DataFrame = self.analyze(scenarios, pool)
+                if parquet:
+                    table = pa.Table.from_pandas(results, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_path, table.schema)
+                    writer.write_table(table)
+                else:
+                    results.to_csv(output_path, mode="w" if n_scenarios == 0 else "a",
+                                   header=n_scenarios == 0, index=False)
+                n_scenarios += len(scenarios)
+        finally:
+            if writer is not None:
+                writer.close()
+            if pool is not None:
+                pool.shutdown()
+        return n_scenarios
+
+
+# The Table of the current worker process, reused across scenarios
+_worker_table: Table = None
+
+def _analyze_rows(rows: list[tuple], settings: tuple) -> list[dict]:
+    global _worker_table
+    if _worker_table is None:
+        _worker_table = Table()
+    results: list[dict] = []
+    for row, player, board, opponents in rows:
+        try:
+            results.extend(_analyze_row(_worker_table, row, player, board, opponents, settings))
+        except (ValueError, TypeError) as error:
+            # One bad scenario should not end a long run
+            results.append({"row": int(row), "player": player, "board": board, "error": str(error)})
+    return results
+
+
+def _analyze_row(table: Table, row: int, player: str, board: str, opponents: str, settings: tuple) -> list[dict]:
+    # Analyzes one scenario, giving one result per number of opponents.
+    n_samples, seed, equity, ranges = settings
+    player_cards: list[Card] = Card.parse_many(player)
+    if len(player_cards) != 2:
+        raise ValueError(f"The player must have 2 cards, not {len(player_cards)}")
+    table.manual_game(*player_cards)
+    board_cards: list[Card] = Card.parse_many(board)
+    if board_cards:
+        table.add_community(*board_cards)
+    row_seed: int = None if seed is None else seed + int(row)
+    try:
+        counts: list[int] = [int(n) for n in opponents.replace(",", ";").split(";") if n.strip()]
+    except ValueError:
+        raise ValueError(f"Cannot read numbers of opponents from {opponents!r}") from None
+    if not counts:
+        raise ValueError("No number of opponents given")
+
+    base: dict = {"row": int(row), "player": player, "board": board}
+    results: list[dict] = []
+    if equity:
+        player_level: int = CompactHand(table.player + table.community_cards).best_hand()["level"]
+        for n in counts:
+            result: dict = table.equity(n, n_samples, seed=row_seed, ranges=ranges)
+            levels: pd.DataFrame = result["levels"]
+            results.append({
+                **base, "opponents": n, "player_level": int(player_level),
+                "exact": result["samples"] == "exact",
+                "samples": 0 if result["samples"] == "exact" else result["samples"],
+                "win": result["win"], "tie": result["tie"], "loss": result["loss"], "equity": result["equity"],
+                **dict(zip(BatchRunner.level_columns, levels["Opponents"].to_numpy()[::-1].tolist())),
+            })
+    else:
+        # Sampled rather than read from PreflopTable, so a seeded row
+        # gives the same result whichever table it runs on
+        outcomes: dict = table.outcome_probabilities(counts, n_samples, seed=row_seed, preflop_table=False,
+                                                     ranges=ranges)
+        for n in counts:
+            outcome: dict = outcomes[n]
+            results.append({
+                **base, "opponents": n, "player_level": outcome["player_level"], "exact": outcome["exact"],
+                "samples": 0 if outcome["exact"] else int(outcome["samples"]),
+                "win": outcome["win"], "tie": outcome["tie"], "loss": outcome["loss"],
+                **dict(zip(BatchRunner.level_columns, outcome["levels"].tolist())),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Analyze many table states from a CSV or Parquet file.")
+    parser.add_argument("input", help="CSV or Parquet file with player, board and opponents columns")
+    parser.add_argument("output", help="Parquet file to write (or CSV, if it ends in .csv)")
+    parser.add_argument("--samples", type=int, default=10000, help="samples per analysis")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=10000, help="input rows held in memory at once")
+    parser.add_argument("--equity", action="store_true", help="deal the rest of the board, as per Table.equity")
+    parser.add_argument("--range", default=None, help="the opponents' range, as per HandRange")
+    arguments = parser.parse_args()
+    runner = BatchRunner(arguments.samples, arguments.seed, arguments.workers, arguments.chunksize,
+                         arguments.equity, arguments.range)
+    print(f"Analyzed {runner.run(arguments.input, arguments.output)} scenarios.")
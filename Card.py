@@ -1,6 +1,25 @@
+import re
+
 class Card:
-    def __init__(self, rank: str = None, suit: str = None):
+    __slots__ = ("id", "rank_int", "suit_int", "rank", "suit", "value", "str", "repr")
+
+    # Used to build card ids. A card's id is 4*(rank_int-2) + suit_int, so ids
+    # run from 0 (the 2 of clubs) to 51 (the ace of hearts).
+    ranks: str = '23456789TJQKA'
+    suits: str = 'CSDH'
+
+    # Interned instances, filled in once below the class body.
+    _by_id: list = []
+    _by_string: dict = {}
+    _blank = None
+
+    def __new__(cls, rank: str = None, suit: str = None):
         '''A class that represents a standard playing card.
+
+        There is exactly one instance of each of the 52 cards (plus a blank 
+        card, used as a spacer by print_cards), so constructing a Card is a 
+        lookup rather than an allocation, and identical cards are the same 
+        object.
         
         Argument pattern 1:
         rank: A string containing the rank (first letter for
@@ -11,17 +30,38 @@ class Card:
         suit: A string containing the suit
         
         Instance variables:
+        id: An int from 0 to 51 that uniquely identifies the card.
+        rank_int: An int containing the value of the card, with Jack, Queen, 
+            King, and Ace as 11, 12, 13, and 14 respectively.
+        suit_int: An int from 0 to 3 containing the index of the suit in 
+            Card.suits.
         rank: A string containing the rank
         suit: A string containing the first letter of the suit (capitalized)
         value: A string containing the hexadecimal value of the card, with Jack,
             Queen, King, and Ace as 11, 12, 13, and 14 respectively.
         '''
 
-        if (suit is None) and (rank is None):
-            self.suit = ""
-            self.rank = ""
-            return
-        
+        if suit is None:
+            if rank is None:
+                return cls._blank
+            # Fast path for the common "QH" form.
+            if isinstance(rank, str):
+                card = cls._by_string.get(rank)
+                if card is not None:
+                    return card
+        return cls._by_id[cls.parse(rank, suit)]
+
+    @staticmethod
+    def parse(rank: str, suit: str = None) -> int:
+        '''Converts either of the Card argument patterns to a card id.
+
+        Positional arguments:
+        rank (str | int): As in the Card constructor.
+        suit (str): As in the Card constructor.
+
+        Returns: An int from 0 to 51 representing the card's id.
+        '''
+
         # Handles pattern 1.
         if suit is None:
             suit: str = rank[-1]
@@ -32,9 +72,9 @@ class Card:
 
         # Allows most representations of the suit to be handled with the same
         # code.
-        self.suit: str = suit[0].upper()
-        if not self.suit in ('H', 'D', 'S', 'C'):
-            raise ValueError(f"Suit {self.suit} does not match 'H', 'D', 'S', or 'C'")
+        suit_int: int = Card.suits.find(suit[0].upper())
+        if suit_int == -1:
+            raise ValueError(f"Suit {suit[0].upper()} does not match 'H', 'D', 'S', or 'C'")
         
         if isinstance(rank, int):
             if (rank < 1 or rank > 14):
@@ -45,53 +85,72 @@ class Card:
             raise TypeError(f"Optional argument rank must be of type str, not {type(rank)}")
 
         if rank.isnumeric():
-            # Handles numeric cards' ranks and values
-            self.rank: str = rank
-            self.value: str = rank
-
-            if (int(rank) < 1 or int(rank) > 14):
-                raise ValueError(f"Optional argument rank must be between 1 and 14 inclusive, not {self.rank}")
-
-            match self.value:
-                case '1':
-                    self.rank: str = 'A'
-                    self.value: str = 'E'
-                case '10':
-                    self.rank: str = 'T'
-                    self.value: str = 'A'
-                case '11':
-                    self.rank: str = 'J'
-                    self.value: str = 'B'
-                case '12':
-                    self.rank: str = 'Q'
-                    self.value: str = 'C'
-                case '13':
-                    self.rank: str = 'K'
-                    self.value: str = 'D'
-                case '14':
-                    self.rank: str = 'A'
-                    self.value: str = 'E'
-                
+            # Handles numeric cards' ranks, with 1 and 14 both meaning Ace.
+            rank_int: int = int(rank)
+            if (rank_int < 1 or rank_int > 14):
+                raise ValueError(f"Optional argument rank must be between 1 and 14 inclusive, not {rank}")
+            if rank_int == 1:
+                rank_int = 14
         else:
-            # Handles face cards' ranks and values.
-            self.rank: str = rank[0].upper()
-            match self.rank:
-                case 'T':
-                    self.value: str = 'A'
-                case 'J':
-                    self.value: str = 'B'
-                case 'Q':
-                    self.value: str = 'C'
-                case 'K':
-                    self.value: str = 'D'
-                case 'A':
-                    self.value: str = 'E'
-                case _:
-                    raise ValueError(f"Positional argument rank must match 'T', 'J', 'Q', 'K', or 'A', not {self.rank}")
-        
-        self.str: str = f'{self.rank[0]}{self.suit}'
-        self.repr: str = f"Card('{self.rank}{self.suit}')"
-        self.hash: int = hash(self.repr)
+            # Handles face cards' ranks.
+            rank_int: int = Card.ranks.find(rank[0].upper(), 8) + 2
+            if rank_int == 1:
+                raise ValueError(f"Positional argument rank must match 'T', 'J', 'Q', 'K', or 'A', not {rank[0].upper()}")
+
+        return 4*(rank_int-2) + suit_int
+
+    @staticmethod
+    def parse_many(text: str) -> list:
+        '''Converts a string of cards, such as "AS KD", "AS,KD" or "ASKD", 
+        to a list of Cards.
+
+        Positional arguments:
+        text (str): Cards in the "QH" form, separated by spaces or commas, 
+            or run together. Ranks may also be written as "10".
+
+        Returns: A list of Card objects, in the order written.
+        '''
+        if not isinstance(text, str):
+            raise TypeError(f"Positional argument text must be of type str, not {type(text)}")
+        text = text.strip().upper()
+        if re.sub(r"(10|[2-9TJQKA])[CSDH]|[\s,]", "", text):
+            raise ValueError(f"Cannot read cards from {text!r}")
+        return [Card(rank, suit) for rank, suit in re.findall(r"(10|[2-9TJQKA])([CSDH])", text)]
+
+    @classmethod
+    def from_id(cls, card_id: int):
+        '''Returns the card with the given id, as per Card.parse.'''
+        return cls._by_id[card_id]
+
+    @classmethod
+    def _build(cls, card_id: int):
+        card = object.__new__(cls)
+        if card_id < 0:
+            # The blank card
+            fields = (card_id, 0, -1, "", "", "", "", "Card()")
+        else:
+            rank_int: int = card_id//4 + 2
+            rank: str = cls.ranks[rank_int-2]
+            suit: str = cls.suits[card_id % 4]
+            fields = (card_id, rank_int, card_id % 4, rank, suit, f'{rank_int:X}',
+                      f'{rank}{suit}', f"Card('{rank}{suit}')")
+        for name, field in zip(cls.__slots__, fields):
+            object.__setattr__(card, name, field)
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card objects are immutable.")
+
+    def __reduce__(self):
+        # Keeps cards interned across pickling, e.g. when sent to worker 
+        # processes.
+        return (Card.from_id, (self.id,)) if self.id >= 0 else (Card, ())
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
     
     def __repr__(self) -> str:
         return self.repr
@@ -100,21 +159,19 @@ class Card:
         return self.str
     
     def __hash__(self) -> int:
-        return self.hash
+        return self.id
     
-    # ADD: __eq__, __gt__, __lt__, 
     def  __eq__(self, card) -> bool:
-        if not isinstance(card, Card):
-            return False
-        same_value: bool = self.value == card.value
-        same_suit: bool = self.suit == card.suit
-        return same_value and same_suit
+        # Cards are interned, so equal cards are the same object.
+        return self is card
     def __lt__(self, card) -> bool:
         if not isinstance(card, Card):
-            return TypeError(f"Cannot compare Card to type {type(card)}")
-        return int(self.value, 16) < int(card.value, 16)
+            raise TypeError(f"Cannot compare Card to type {type(card)}")
+        return self.rank_int < card.rank_int
     def __gt__(self, card) -> bool:
-        return not (self.__eq__(card) or self.__lt(card))
+        if not isinstance(card, Card):
+            raise TypeError(f"Cannot compare Card to type {type(card)}")
+        return self.rank_int > card.rank_int
     
     @staticmethod
     def ascii_art(card):
@@ -186,3 +243,13 @@ class Card:
         # Print one more line break to finish
         print("")
 
+
+Card._by_id = [Card._build(card_id) for card_id in range(52)]
+Card._blank = Card._build(-1)
+for _card in Card._by_id:
+    for _suit in (_card.suit, _card.suit.lower()):
+        for _rank in (_card.rank, _card.rank.lower()):
+            Card._by_string[_rank + _suit] = _card
+    if _card.rank == 'T':
+        Card._by_string['10' + _card.suit] = _card
+del _card, _suit, _rank
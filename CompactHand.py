@@ -0,0 +1,138 @@
+from Card import Card
+from HandEvaluator import HandEvaluator
+
+class CompactHand:
+    __slots__ = ("mask", "rank_key", "suit_key", "suit_masks", "_strength")
+    # The most cards HandEvaluator's tables can rate
+    max_cards: int = 7
+
+    def __new__(cls, cards = ()):
+        """An immutable hand of up to seven cards, stored as a 52-bit mask
+            of card ids together with its evaluator keys, as per
+            HandEvaluator.
+
+        Unlike PokerHand, a CompactHand never changes: with_card returns a
+            new hand in O(1), starting from this hand's keys instead of
+            re-reading its cards. Hands with the same cards are equal and
+            hash alike, so they can key a dictionary to memoize results.
+
+        Optional arguments:
+        cards (Iterable[Card]): The cards in the hand, at most seven. 
+            Defaults to none.
+
+        Instance variables:
+        mask (int): Bit i is set if the hand holds the card with id i.
+        rank_key (int): The hand's rank key, as per HandEvaluator.
+        suit_key (int): The hand's suit key, as per HandEvaluator.
+        suit_masks (tuple[int]): 13-bit rank masks of the cards in each
+            suit, indexed by Card.suit_int.
+
+        Properties:
+        cards (tuple[Card]): The cards in the hand, in ascending order of
+            id.
+
+        Methods:
+        from_ids: Builds a hand from card ids.
+        with_card: Returns the hand with one more card.
+        best_hand: Determines the strength of the hand, as per
+            PokerHand.best_hand().
+        """
+        rank_keys: list[int] = HandEvaluator.rank_keys
+        suit_keys: list[int] = HandEvaluator.suit_keys
+        rank_bits: list[int] = HandEvaluator.rank_bits
+        mask: int = 0
+        rank_key: int = 0
+        suit_key: int = 0
+        suit_masks: list[int] = [0, 0, 0, 0]
+        for card in cards:
+            if not isinstance(card, Card):
+                raise TypeError(f"All elements of optional argument cards must be of type Card, not {type(card)}")
+            card_id: int = card.id
+            if card_id < 0:
+                raise ValueError("All elements of optional argument cards must be playing cards, not the blank Card()")
+            if (mask >> card_id) & 1:
+                raise ValueError(f"Card {card} is already in the hand.")
+            if mask.bit_count() == CompactHand.max_cards:
+                raise ValueError(f"A CompactHand holds at most {CompactHand.max_cards} cards.")
+            mask |= 1 << card_id
+            rank_key += rank_keys[card_id]
+            suit_key += suit_keys[card_id]
+            suit_masks[card_id & 3] |= rank_bits[card_id]
+        return CompactHand._make(mask, rank_key, suit_key, tuple(suit_masks))
+
+    @staticmethod
+    def _make(mask: int, rank_key: int, suit_key: int, suit_masks: tuple[int]):
+        hand: CompactHand = object.__new__(CompactHand)
+        _set(hand, "mask", mask)
+        _set(hand, "rank_key", rank_key)
+        _set(hand, "suit_key", suit_key)
+        _set(hand, "suit_masks", suit_masks)
+        _set(hand, "_strength", None)
+        return hand
+
+    @staticmethod
+    def from_ids(card_ids) -> "CompactHand":
+        """Builds a hand from an iterable of card ids, as per Card.id."""
+        return CompactHand([Card.from_id(card_id) for card_id in card_ids])
+
+    def with_card(self, card: Card) -> "CompactHand":
+        """Returns a new hand with the cards of this one plus card."""
+        if not isinstance(card, Card):
+            raise TypeError(f"Positional argument card must be of type Card, not {type(card)}")
+        card_id: int = card.id
+        if card_id < 0:
+            raise ValueError("Positional argument card must be a playing card, not the blank Card()")
+        bit: int = 1 << card_id
+        if self.mask & bit:
+            raise ValueError(f"Card {card} is already in the hand.")
+        if self.mask.bit_count() == CompactHand.max_cards:
+            raise ValueError(f"A CompactHand holds at most {CompactHand.max_cards} cards.")
+        # Only the new card's suit mask changes; the others are shared.
+        suit: int = card_id & 3
+        suit_masks: tuple[int] = self.suit_masks
+        suit_masks = suit_masks[:suit] + (suit_masks[suit] | HandEvaluator.rank_bits[card_id],) + suit_masks[suit+1:]
+        return CompactHand._make(self.mask | bit, self.rank_key + HandEvaluator.rank_keys[card_id],
+                                 self.suit_key + HandEvaluator.suit_keys[card_id], suit_masks)
+
+    def best_hand(self) -> dict:
+        """Determines the strength of the hand, as per PokerHand.best_hand().
+            The result is computed once per hand object.
+        """
+        if self._strength is None:
+            level, value = HandEvaluator.rate(self.rank_key, self.suit_key, self.suit_masks)
+            _set(self, "_strength", (level, value))
+        level, value = self._strength
+        return {"level": level, "value": value}
+
+    @property
+    def cards(self) -> tuple[Card]:
+        return tuple(Card.from_id(card_id) for card_id in range(52) if (self.mask >> card_id) & 1)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompactHand objects are immutable.")
+
+    def __reduce__(self):
+        # Pickles the keys, since unpickling cannot assign to the slots.
+        return (CompactHand._make, (self.mask, self.rank_key, self.suit_key, self.suit_masks))
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __contains__(self, card: Card) -> bool:
+        return isinstance(card, Card) and card.id >= 0 and bool((self.mask >> card.id) & 1)
+
+    def __hash__(self) -> int:
+        return hash(self.mask)
+
+    def __eq__(self, hand) -> bool:
+        return isinstance(hand, CompactHand) and self.mask == hand.mask
+
+    def __repr__(self) -> str:
+        return f"CompactHand([{', '.join(repr(card) for card in self.cards)}])"
+
+
+# Bypasses CompactHand.__setattr__, which refuses every assignment
+_set = object.__setattr__
@@ -1,27 +1,165 @@
-from random import shuffle
+from random import randrange, shuffle
 from Card import Card
 
 class Deck:
+    # Card ids in the order of a new Deck: aces first, then 2 through King,
+    # each in the suit order C, S, D, H. The top of the deck is the end.
+    _new_order: list[int] = [Card(str(rank), suit).id for rank in range(1, 14) for suit in ('C', 'S', 'D', 'H')]
+    _full_mask: int = (1 << 52) - 1
+
     def __init__(self):
-        self.cards: list[Card] = [Card(str(rank), suit) for rank in range(1, 14) for suit in ('C', 'S', 'D', 'H')]
+        """A deck of playing cards, top card last.
+
+        The cards left are kept as a 52-bit mask of card ids, so membership
+            and remove are O(1), alongside a list of ids in deck order.
+            Removed cards stay in the list until they reach the top or the
+            list is mostly removed cards, and are skipped over.
+
+        shuffle is lazy: it only marks the deck as unshuffled, and draw and
+            peek run Fisher–Yates from the top down for just the cards they
+            take, so drawing k cards costs O(k) rather than a shuffle of the
+            whole deck. Iterating or copying the deck finishes the shuffle 
+            first.
+
+        Instance variables:
+        cards (list[Card]): The cards left, top card last. A new list on
+            every access.
+
+        Methods:
+        shuffle: Shuffles the deck.
+        draw: Removes and returns cards from the top of the deck.
+        peek: Returns cards from the top of the deck without removing them.
+        remove: Removes a card.
+        copy: Returns an independent copy of the deck.
+        reset: Restores the deck to a new, unshuffled Deck.
+        card_ids: Returns the ids of the cards left, in ascending order.
+        """
+        self._order: list[int] = list(Deck._new_order)
+        self._mask: int = Deck._full_mask
+        self._size: int = 52
+        # The first _unshuffled entries of _order are yet to be shuffled.
+        self._unshuffled: int = 0
+
+    @property
+    def cards(self) -> list[Card]:
+        return list(self)
 
     def shuffle(self) -> None:
-        shuffle(self.cards)
+        self._unshuffled = len(self._order)
+
+    def _settle(self, count: int) -> None:
+        # Moves removed cards off the top and fixes the order of the top
+        # count cards, leaving them as the last count entries of _order.
+        order: list[int] = self._order
+        mask: int = self._mask
+        while not (mask >> order[-1]) & 1:
+            order.pop()
+        if count <= 1 and len(order) > self._unshuffled:
+            return
+        if len(order) > 2*self._size + 8:
+            self._compact()
+            order = self._order
+        position: int = len(order) - 1
+        settled: int = 0
+        while settled < count:
+            if position < self._unshuffled:
+                # One step of Fisher–Yates: a random unshuffled entry,
+                # removed or not, takes this place.
+                swap: int = randrange(position + 1)
+                order[position], order[swap] = order[swap], order[position]
+                self._unshuffled = position
+            if (mask >> order[position]) & 1:
+                settled += 1
+                position -= 1
+            else:
+                # A removed card takes no place in the order.
+                del order[position]
+                position -= 1
+
+    def _compact(self) -> None:
+        # Drops removed cards from _order, keeping the order of the rest.
+        mask: int = self._mask
+        unshuffled: list[int] = [card_id for card_id in self._order[:self._unshuffled] if (mask >> card_id) & 1]
+        self._order = unshuffled + [card_id for card_id in self._order[self._unshuffled:] if (mask >> card_id) & 1]
+        self._unshuffled = len(unshuffled)
 
     def draw(self, count: int = 1) -> tuple[Card]:
         if not isinstance(count, int):
-            return TypeError(f"Default argument count must be of type int.")
+            raise TypeError(f"Default argument count must be of type int.")
         if count > len(self):
             raise ValueError(f"Cannot draw {count} cards from a Deck of length {len(self)}.")
-        return tuple([self.cards.pop() for i in range(count)])
-    
+        cards: list[Card] = []
+        for _ in range(count):
+            self._settle(1)
+            card_id: int = self._order.pop()
+            self._mask &= ~(1 << card_id)
+            self._size -= 1
+            cards.append(Card._by_id[card_id])
+        return tuple(cards)
+
+    def peek(self, count: int = 1) -> tuple[Card]:
+        """Returns the cards draw(count) would return, in the same order,
+            without removing them.
+        """
+        if not isinstance(count, int):
+            raise TypeError(f"Default argument count must be of type int.")
+        if count > len(self):
+            raise ValueError(f"Cannot peek at {count} cards from a Deck of length {len(self)}.")
+        if count == 0:
+            return ()
+        self._settle(count)
+        return tuple(Card._by_id[card_id] for card_id in reversed(self._order[-count:]))
+
     def __len__(self) -> int:
-        return len(self.cards)
-    
+        return self._size
+
+    def _finish_shuffle(self) -> None:
+        # Fixes the order of every card, shuffling what is left to shuffle.
+        if self._unshuffled:
+            prefix: list[int] = self._order[:self._unshuffled]
+            shuffle(prefix)
+            self._order[:self._unshuffled] = prefix
+            self._unshuffled = 0
+
     def __iter__(self):
-        yield from self.cards
-    
+        self._finish_shuffle()
+        mask: int = self._mask
+        for card_id in list(self._order):
+            if (mask >> card_id) & 1:
+                yield Card._by_id[card_id]
+
+    def __contains__(self, card: Card) -> bool:
+        return isinstance(card, Card) and card.id >= 0 and bool((self._mask >> card.id) & 1)
+
     def remove(self, card: Card) -> None:
-        if not (card in self.cards):
+        if not (card in self):
             raise ValueError(f"Card {card} not in deck.")
-        self.cards.remove(card)
\ No newline at end of file
+        self._mask &= ~(1 << card.id)
+        self._size -= 1
+
+    def copy(self):
+        """Returns a Deck with the same cards, in the same order, that can
+            be drawn from independently of this one. A pending shuffle is 
+            finished first, so both decks deal the same cards.
+        """
+        self._finish_shuffle()
+        deck: Deck = Deck.__new__(Deck)
+        deck._order = list(self._order)
+        deck._mask = self._mask
+        deck._size = self._size
+        deck._unshuffled = self._unshuffled
+        return deck
+
+    def reset(self) -> None:
+        """Puts every card back, in the order of a new Deck."""
+        self._order[:] = Deck._new_order
+        self._mask = Deck._full_mask
+        self._size = 52
+        self._unshuffled = 0
+
+    def card_ids(self) -> list[int]:
+        """Returns the ids of the cards left, in ascending order, without
+            finishing a pending shuffle.
+        """
+        mask: int = self._mask
+        return [card_id for card_id in range(52) if (mask >> card_id) & 1]
@@ -0,0 +1,165 @@
+from HandEvaluator import HandEvaluator
+from Simulator import Simulator
+import itertools
+import math
+import numpy as np
+
+class EquitySimulator:
+    # Number of community cards on a full board
+    board_size: int = 5
+    # Upper bound on the rows evaluated at once, to bound memory use
+    max_batch: int = 1 << 14
+    # Number of hand levels, as per PokerHand.best_hand()
+    n_levels: int = 9
+
+    def __init__(self, simulator: Simulator, card_ids: np.ndarray, player: list[int], community: list[int]):
+        """Vectorized engine behind Table.equity.
+
+        Each sample deals the opponents their holdings as the Simulator
+            would, then deals the rest of the board uniformly from the cards
+            left, and rates every 7-card hand at showdown with
+            HandEvaluator.evaluate_batch. Holdings come first because the
+            ranges describe the hands the opponents were dealt, before any
+            community card.
+
+        Positional arguments:
+        simulator (Simulator): The Simulator of the table state, whose
+            holdings and weights are used to deal the opponents.
+        card_ids (np.ndarray): The ids of the cards left in the deck, in the
+            order of the Simulator's deck positions.
+        player (list[int]): The ids of the player's cards.
+        community (list[int]): The ids of the community cards dealt so far.
+
+        Instance variables:
+        The positional arguments, as NumPy arrays where applicable, plus:
+        n_board (int): The number of community cards still to come.
+
+        Methods:
+        sample_counts: Samples runouts and tallies the results.
+        n_assignments: Counts the runouts exact_counts would enumerate.
+        exact_counts: Enumerates every runout against one opponent.
+        """
+        self.simulator: Simulator = simulator
+        self.card_ids: np.ndarray = np.asarray(card_ids, dtype=np.int64)
+        self.player: np.ndarray = np.asarray(player, dtype=np.int64)
+        self.community: np.ndarray = np.asarray(community, dtype=np.int64)
+        self.n_board: int = self.board_size - len(self.community)
+
+    def _empty_counts(self) -> dict:
+        return {
+            "outcomes": np.zeros(3),
+            "share": 0.0,
+            "player_levels": np.zeros(self.n_levels),
+            "opponent_levels": np.zeros(self.n_levels),
+        }
+
+    def _tally(self, counts: dict, boards: np.ndarray, holdings: np.ndarray, weights: np.ndarray) -> None:
+        # Rates the showdown of each row, given the rest of the board (as
+        # card ids) and the opponents' holdings (as holding indices), and
+        # adds it to counts with the given weight.
+        n_rows, opponents = holdings.shape
+        board: np.ndarray = np.concatenate([np.broadcast_to(self.community, (n_rows, len(self.community))),
+                                            boards], axis=1)
+        player_values, player_levels = HandEvaluator.evaluate_batch(
+            np.concatenate([np.broadcast_to(self.player, (n_rows, len(self.player))), board], axis=1))
+
+        holding_cards: np.ndarray = np.stack([self.card_ids[self.simulator.first[holdings]],
+                                              self.card_ids[self.simulator.second[holdings]]], axis=2)
+        opponent_hands: np.ndarray = np.concatenate(
+            [holding_cards, np.broadcast_to(board[:, None, :], (n_rows, opponents, board.shape[1]))], axis=2)
+        values, levels = HandEvaluator.evaluate_batch(opponent_hands.reshape(n_rows*opponents, -1))
+        values = values.reshape(n_rows, opponents)
+        levels = levels.reshape(n_rows, opponents)
+        best: np.ndarray = values.argmax(axis=1)
+        best_values: np.ndarray = values[np.arange(n_rows), best]
+        best_levels: np.ndarray = levels[np.arange(n_rows), best]
+
+        # 0, 1 and 2 for a loss, tie and win
+        outcomes: np.ndarray = np.sign(player_values - best_values) + 1
+        # A tie splits the pot between the player and every tied opponent
+        tied: np.ndarray = (values == player_values[:, None]).sum(axis=1)
+        shares: np.ndarray = np.where(outcomes == 2, 1.0, np.where(outcomes == 1, 1 / (tied + 1), 0.0))
+
+        counts["outcomes"] += np.bincount(outcomes, weights=weights, minlength=3)
+        counts["share"] += float((shares * weights).sum())
+        counts["player_levels"] += np.bincount(player_levels, weights=weights, minlength=self.n_levels)
+        counts["opponent_levels"] += np.bincount(best_levels, weights=weights, minlength=self.n_levels)
+
+    def _check_seats(self, opponents: int) -> None:
+        if 2*opponents + self.n_board > len(self.card_ids):
+            raise ValueError(f"Cannot deal {opponents} opponents and the rest of the board from a Deck of "
+                             f"length {len(self.card_ids)}.")
+        self.simulator._check_seats(opponents)
+
+    def sample_counts(self, opponents: int, n_samples: int, rng: np.random.Generator) -> dict:
+        """Deals random runouts and tallies the showdowns.
+
+        Positional arguments:
+        opponents (int): The number of opponents, each dealt one holding.
+        n_samples (int): The number of runouts to deal.
+        rng (np.random.Generator): The source of randomness.
+
+        Returns: A dictionary with the number of samples the player loses,
+            ties and wins ("outcomes", an array of three), the player's
+            total share of the pot ("share"), and the number of samples in
+            which the player's and the best opponent's final hand has each
+            level ("player_levels" and "opponent_levels", arrays of nine).
+        """
+        self._check_seats(opponents)
+        counts: dict = self._empty_counts()
+        deck_size: int = len(self.card_ids)
+        for start in range(0, n_samples, self.max_batch):
+            n_rows: int = min(self.max_batch, n_samples - start)
+            holdings: np.ndarray = self.simulator._draw(opponents, n_rows, rng)
+            if self.n_board:
+                keys: np.ndarray = rng.random((n_rows, deck_size))
+                # The holdings' cards sort last, so the board is dealt 
+                # uniformly from the rest.
+                rows: np.ndarray = np.arange(n_rows)[:, None]
+                keys[rows, self.simulator.first[holdings]] = 2.0
+                keys[rows, self.simulator.second[holdings]] = 2.0
+                positions: np.ndarray = np.argpartition(keys, self.n_board - 1, axis=1)[:, :self.n_board]
+            else:
+                positions: np.ndarray = np.empty((n_rows, 0), dtype=np.int64)
+            self._tally(counts, self.card_ids[positions], holdings, np.ones(n_rows))
+        return counts
+
+    def n_assignments(self, opponents: int) -> int:
+        """Returns an upper bound on the number of ways to deal the rest of
+            the board and the opponents' holdings, as per
+            Simulator.n_assignments.
+        """
+        return math.comb(len(self.card_ids), self.n_board) * self.simulator.n_assignments(opponents)
+
+    def exact_counts(self, opponents: int) -> dict:
+        """Enumerates every holding of a single opponent and every runout
+            of the board, weighted by its probability as dealt in
+            sample_counts: a holding with weight w out of a total W has
+            probability w/W, and each of the C(n-2, k) runouts of the n 
+            cards it leaves then has probability 1/C(n-2, k).
+
+        Positional arguments:
+        opponents (int): The number of opponents. Must be 1.
+
+        Returns: As per sample_counts, with probabilities in place of
+            numbers of samples.
+        """
+        if opponents != 1:
+            raise ValueError(f"Exact equity supports 1 opponent, not {opponents}")
+        self._check_seats(opponents)
+        counts: dict = self._empty_counts()
+        runouts: list[tuple] = list(itertools.combinations(range(len(self.card_ids)), self.n_board))
+        boards: np.ndarray = np.array(runouts, dtype=np.int64).reshape(len(runouts), self.n_board)
+        board_masks: np.ndarray = (np.int64(1) << boards).sum(axis=1)
+        candidates, card_masks = self.simulator._seat_tables[0][:2]
+        weights: np.ndarray = self.simulator.weights[0, candidates]
+        # Every holding leaves the same number of runouts
+        scale: float = 1 / (weights.sum() * math.comb(len(self.card_ids) - 2, self.n_board))
+
+        step: int = max(1, self.max_batch // len(candidates))
+        for start in range(0, len(boards), step):
+            free: np.ndarray = (card_masks[None, :] & board_masks[start:start + step, None]) == 0
+            rows, columns = np.nonzero(free)
+            self._tally(counts, self.card_ids[boards[start + rows]], candidates[columns][:, None],
+                        weights[columns] * scale)
+        return counts
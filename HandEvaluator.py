@@ -0,0 +1,313 @@
+from Card import Card
+import itertools
+import numpy as np
+
+class HandEvaluator:
+    """Rates hands of up to seven cards with precomputed lookup tables.
+
+    Produces exactly the same {"level", "value"} dictionaries as the
+    detector methods of PokerHand, but each hand costs one pass over its
+    cards and one or two table lookups instead of a cascade of regexes.
+
+    A hand is reduced to two additive keys:
+    - The rank key is the sum of 5**rank_index over the cards, i.e. the
+        base-5 digits of the key are the number of cards of each rank. It
+        identifies the hand's rank multiset, which decides every non-flush
+        category, and indexes rank_table.
+    - The suit key is the sum of 16**suit_int over the cards, i.e. one
+        hexadecimal digit counting the cards of each suit. Adding 0x3333
+        sets the top bit of a digit exactly when that suit has five or more
+        cards, so it detects flushes without a loop. The 13-bit rank mask
+        of the flushing suit then indexes flush_table.
+    Because both keys are sums, they can be updated one card at a time.
+
+    Class variables:
+    rank_keys (list[int]): The rank key of each card id.
+    suit_keys (list[int]): The suit key of each card id.
+    rank_bits (list[int]): The bit representing each card id's rank in a
+        13-bit rank mask, with bit 0 for 2 and bit 12 for Ace.
+    rank_table (dict[int: tuple[int]]): Maps a rank key to the (level,
+        value) of the best non-flush hand. Built on first use.
+    flush_table (list[tuple[int]]): Maps the rank mask of a suit with five
+        or more cards to the (level, value) of its flush or straight flush.
+        Built on first use.
+    batch_tables (dict[str: np.ndarray]): NumPy copies of rank_table (as
+        sorted keys with matching values and levels) and flush_table, used
+        by evaluate_batch. Built on first use.
+
+    Class methods:
+    evaluate: Rates a list of Card objects.
+    evaluate_ids: Rates a sequence of card ids.
+    rate: Rates a hand from its rank key, suit key and flush-suit mask.
+    evaluate_batch: Rates an array of hands with vectorized NumPy 
+        operations.
+    rate_batch: Rates an array of hands from their keys, as per rate.
+    build_tables: Generates rank_table and flush_table.
+    """
+
+    rank_keys: list[int] = [5 ** (card_id // 4) for card_id in range(52)]
+    suit_keys: list[int] = [1 << (4 * (card_id % 4)) for card_id in range(52)]
+    rank_bits: list[int] = [1 << (card_id // 4) for card_id in range(52)]
+
+    rank_table: dict[int: tuple[int]] = None
+    flush_table: list[tuple[int]] = None
+    batch_tables: dict[str: np.ndarray] = None
+
+    @classmethod
+    def evaluate(cls, cards: list[Card]) -> dict:
+        """Determines the strength of a hand of Card objects.
+
+        Positional arguments:
+        cards (list[Card]): Up to seven cards. The list is not modified.
+
+        Returns: A two-item dictionary with the same "level" and "value"
+            as PokerHand.best_hand().
+        """
+        return cls.evaluate_ids([card.id for card in cards])
+
+    @classmethod
+    def evaluate_ids(cls, card_ids) -> dict:
+        """Determines the strength of a hand of card ids, as per Card.id.
+
+        Positional arguments:
+        card_ids (Iterable[int]): Up to seven distinct card ids.
+
+        Returns: A two-item dictionary with the same "level" and "value"
+            as PokerHand.best_hand().
+        """
+        if cls.rank_table is None:
+            cls.build_tables()
+        rank_keys = cls.rank_keys
+        suit_keys = cls.suit_keys
+        rank_key = 0
+        suit_key = 0
+        for card_id in card_ids:
+            rank_key += rank_keys[card_id]
+            suit_key += suit_keys[card_id]
+        level, value = cls.rank_table[rank_key]
+
+        flushes: int = (suit_key + 0x3333) & 0x8888
+        if flushes:
+            # At most one suit can have five of seven cards.
+            suit: int = (flushes.bit_length() - 4) >> 2
+            rank_bits = cls.rank_bits
+            mask = 0
+            for card_id in card_ids:
+                if card_id & 3 == suit:
+                    mask |= rank_bits[card_id]
+            flush = cls.flush_table[mask]
+            if flush[1] > value:
+                level, value = flush
+        return {"level": level, "value": value}
+
+    @classmethod
+    def rate(cls, rank_key: int, suit_key: int, suit_masks) -> tuple[int]:
+        """Determines the strength of a hand from its keys, for callers that
+            maintain the keys themselves.
+
+        Positional arguments:
+        rank_key (int): The sum of rank_keys over the hand.
+        suit_key (int): The sum of suit_keys over the hand.
+        suit_masks (Sequence[int]): The 13-bit rank mask of each suit,
+            indexed by Card.suit_int.
+
+        Returns: A (level, value) tuple, as per PokerHand.best_hand().
+        """
+        if cls.rank_table is None:
+            cls.build_tables()
+        best = cls.rank_table[rank_key]
+        flushes: int = (suit_key + 0x3333) & 0x8888
+        if flushes:
+            flush = cls.flush_table[suit_masks[(flushes.bit_length() - 4) >> 2]]
+            if flush[1] > best[1]:
+                return flush
+        return best
+
+    @classmethod
+    def evaluate_batch(cls, card_ids: np.ndarray) -> tuple[np.ndarray]:
+        """Determines the strength of many hands at once.
+
+        Positional arguments:
+        card_ids (np.ndarray): An (N, k) integer array of card ids, as per 
+            Card.id, where each row is one hand of k distinct cards. k is 
+            usually 5, 6 or 7, but any k up to 7 is rated the same way 
+            PokerHand rates it.
+
+        Returns: A tuple of two (N,) arrays. The first contains each hand's 
+            best_hand()["value"] (int64), the second its "level" (int8).
+        """
+        card_ids = np.asarray(card_ids)
+        if card_ids.ndim != 2:
+            raise ValueError(f"Positional argument card_ids must be two-dimensional, not {card_ids.ndim}-dimensional")
+        if card_ids.shape[1] > 7:
+            raise ValueError(f"Hands can have at most 7 cards, not {card_ids.shape[1]}")
+        if cls.batch_tables is None:
+            cls._build_batch_tables()
+        tables = cls.batch_tables
+
+        rank_keys: np.ndarray = tables["rank_keys"][card_ids].sum(axis=1)
+        index: np.ndarray = np.searchsorted(tables["keys"], rank_keys)
+        values: np.ndarray = tables["values"][index]
+        levels: np.ndarray = tables["levels"][index]
+
+        suit_keys: np.ndarray = tables["suit_keys"][card_ids].sum(axis=1)
+        flushes: np.ndarray = np.flatnonzero((suit_keys + 0x3333) & 0x8888)
+        if len(flushes):
+            flush_ids: np.ndarray = card_ids[flushes]
+            flush_suits: np.ndarray = tables["suit_of_key"][suit_keys[flushes]]
+            # Ranks are distinct within a suit, so summing bits is an OR.
+            in_suit: np.ndarray = (flush_ids & 3) == flush_suits[:, None]
+            masks: np.ndarray = np.where(in_suit, tables["rank_bits"][flush_ids], 0).sum(axis=1)
+            flush_values: np.ndarray = tables["flush_values"][masks]
+            better: np.ndarray = flush_values > values[flushes]
+            values[flushes[better]] = flush_values[better]
+            levels[flushes[better]] = tables["flush_levels"][masks[better]]
+        return values, levels
+
+    @classmethod
+    def rate_batch(cls, rank_keys: np.ndarray, suit_keys: np.ndarray,
+                   suit_masks: np.ndarray) -> tuple[np.ndarray]:
+        """Determines the strength of many hands at once from their keys, 
+            for callers that maintain the keys themselves, as per rate.
+
+        Positional arguments:
+        rank_keys (np.ndarray): An (N,) array of rank keys.
+        suit_keys (np.ndarray): An (N,) array of suit keys.
+        suit_masks (np.ndarray): An (N, 4) array of the 13-bit rank masks of
+            each hand's suits, indexed by Card.suit_int.
+
+        Returns: As per evaluate_batch.
+        """
+        if cls.batch_tables is None:
+            cls._build_batch_tables()
+        tables = cls.batch_tables
+
+        index: np.ndarray = np.minimum(np.searchsorted(tables["keys"], rank_keys), len(tables["keys"]) - 1)
+        # A key of more than seven cards is not in the table
+        if not np.array_equal(tables["keys"][index], rank_keys):
+            raise ValueError("Hands can have at most 7 cards, but some rank_keys are not those of any such hand")
+        values: np.ndarray = tables["values"][index]
+        levels: np.ndarray = tables["levels"][index]
+
+        flushes: np.ndarray = np.flatnonzero((suit_keys + 0x3333) & 0x8888)
+        if len(flushes):
+            masks: np.ndarray = suit_masks[flushes, tables["suit_of_key"][suit_keys[flushes]]]
+            flush_values: np.ndarray = tables["flush_values"][masks]
+            better: np.ndarray = flush_values > values[flushes]
+            values[flushes[better]] = flush_values[better]
+            levels[flushes[better]] = tables["flush_levels"][masks[better]]
+        return values, levels
+
+    @classmethod
+    def _build_batch_tables(cls) -> None:
+        # Converts the lookup tables to NumPy arrays for evaluate_batch and
+        # rate_batch.
+        if cls.rank_table is None:
+            cls.build_tables()
+        keys = np.array(sorted(cls.rank_table), dtype=np.int64)
+        rated = [cls.rank_table[key] for key in keys.tolist()]
+        # Maps a suit key with a five-card suit to that suit. Suit keys of 
+        # up to seven cards are below 0x8000.
+        suit_of_key = np.zeros(0x8000, dtype=np.int64)
+        for suit_key in range(0x8000):
+            flushes: int = (suit_key + 0x3333) & 0x8888
+            if flushes:
+                suit_of_key[suit_key] = (flushes.bit_length() - 4) >> 2
+        cls.batch_tables = {
+            "rank_keys": np.array(cls.rank_keys, dtype=np.int64),
+            "suit_keys": np.array(cls.suit_keys, dtype=np.int64),
+            "rank_bits": np.array(cls.rank_bits, dtype=np.int64),
+            "keys": keys,
+            "values": np.array([value for level, value in rated], dtype=np.int64),
+            "levels": np.array([level for level, value in rated], dtype=np.int8),
+            "flush_values": np.array([value for level, value in cls.flush_table], dtype=np.int64),
+            "flush_levels": np.array([level for level, value in cls.flush_table], dtype=np.int8),
+            "suit_of_key": suit_of_key,
+        }
+
+    @staticmethod
+    def _hex_value(level: int, values) -> int:
+        # Appends each card value as a hexadecimal digit after the level.
+        result = level
+        for value in values:
+            result = (result << 4) | value
+        return result
+
+    @staticmethod
+    def _straight_high(mask: int) -> int:
+        # Returns the value of the top card of the highest straight in a 
+        # 13-bit rank mask (5 for the wheel), or 0 if there is none. Bit i of
+        # runs is set when bits i to i+4 of the mask all are.
+        runs = mask & (mask >> 1) & (mask >> 2) & (mask >> 3) & (mask >> 4)
+        if runs:
+            return runs.bit_length() + 5
+        return 5 if mask & 0x100F == 0x100F else 0
+
+    @staticmethod
+    def _straight_values(high: int) -> tuple[int]:
+        # The card values of the straight with top card high, as per
+        # _straight_high
+        return (5, 4, 3, 2, 1) if high == 5 else tuple(range(high, high-5, -1))
+
+    @classmethod
+    def _rate_ranks(cls, values: tuple[int]) -> tuple[int]:
+        # Rates a rank multiset, ignoring flushes. values holds the card 
+        # values in descending order. Mirrors the categories and digit layout
+        # of PokerHand's detector methods, including their handling of hands
+        # with fewer than five cards.
+        groups = sorted(((len(list(group)), value) for value, group in itertools.groupby(values)),
+                        reverse=True)
+        count, top = groups[0]
+
+        if count == 4:
+            kickers = [value for value in values if value != top][:1]
+            return (7, cls._hex_value(7, [top]*4 + kickers))
+        if count == 3 and len(groups) > 1 and groups[1][0] >= 2:
+            pair = max(value for count, value in groups[1:] if count >= 2)
+            return (6, cls._hex_value(6, [top]*3 + [pair]*2))
+        if len(groups) >= 5:
+            high = cls._straight_high(sum(1 << (value-2) for count, value in groups))
+            if high:
+                return (4, cls._hex_value(4, cls._straight_values(high)))
+        if count == 3:
+            kickers = [value for value in values if value != top][:2]
+            return (3, cls._hex_value(3, [top]*3 + kickers))
+        if count == 2 and len(groups) > 1 and groups[1][0] == 2:
+            low = groups[1][1]
+            kickers = [value for value in values if value not in (top, low)][:1]
+            return (2, cls._hex_value(2, [top]*2 + [low]*2 + kickers))
+        if count == 2:
+            kickers = [value for value in values if value != top][:3]
+            return (1, cls._hex_value(1, [top]*2 + kickers))
+        return (0, cls._hex_value(0, values[:5]))
+
+    @classmethod
+    def build_tables(cls) -> None:
+        """Generates rank_table and flush_table. Called automatically the
+            first time a hand is rated; takes about a second.
+
+        Arguments: None
+
+        Returns: None
+        """
+        rank_table: dict[int: tuple[int]] = {0: (0, 0)}
+        for n_cards in range(1, 8):
+            for values in itertools.combinations_with_replacement(range(14, 1, -1), n_cards):
+                # Skips multisets with five cards of one rank.
+                if any(values[i] == values[i+4] for i in range(n_cards - 4)):
+                    continue
+                rank_table[sum(5 ** (value-2) for value in values)] = cls._rate_ranks(values)
+
+        flush_table: list[tuple[int]] = [(0, 0)] * 8192
+        for mask in range(8192):
+            if mask.bit_count() < 5:
+                continue
+            high = cls._straight_high(mask)
+            if high:
+                flush_table[mask] = (8, cls._hex_value(8, cls._straight_values(high)))
+            else:
+                values = [value for value in range(14, 1, -1) if mask & (1 << (value-2))]
+                flush_table[mask] = (5, cls._hex_value(5, values[:5]))
+
+        cls.flush_table = flush_table
+        cls.rank_table = rank_table
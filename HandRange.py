@@ -0,0 +1,159 @@
+from Card import Card
+import numpy as np
+
+class HandRange:
+    """Opponent ranges written in standard notation, compiled to weights over
+    the 1,326 two-card holdings.
+
+    A range is a comma-separated list of starting hand classes (see
+    PreflopTable.hand_class), each optionally followed by a colon and a
+    weight, such as "QQ+, AKs, ATo+:0.5, 76s". The forms are:
+        "QQ"       one pair
+        "QQ+"      QQ and every higher pair
+        "QQ-99"    every pair from 99 to QQ
+        "AKs"      a suited hand; "AKo" for offsuit, "AK" for both
+        "ATs+"     AT up to AK, i.e. raising the lower card up to one below
+                   the higher one
+        "KTs-K7s"  K7 up to KT, with the same higher card
+    Weights give how likely the hand is played, relative to the others, and
+    default to 1. A class named more than once takes its last weight.
+
+    Ranges only name classes, so they treat all suits alike, and a table
+    state's results stay the same under any relabeling of suits.
+
+    Class variables:
+    default (str): The range of the original reasonability check: at
+        least one King or Ace, both cards 10 or higher, consecutive ranks,
+        suited, or a pair.
+    combo_index (np.ndarray): A (52, 52) array mapping two card ids to
+        the index of their holding among the 1,326.
+
+    Static methods:
+    parse: Converts a range to the weight of each class it names.
+    compile: Converts a range to the weight of each of the 1,326 holdings.
+    holding_weights: Looks up the weights of given holdings.
+    """
+
+    default: str = "22+, A2+, K2+, QT+, JT, T9, 98, 87, 76, 65, 54, 43, 32, " \
+        "Q2s+, J2s+, T2s+, 92s+, 82s+, 72s+, 62s+, 52s+, 42s+, 32s"
+
+    combo_index: np.ndarray = np.full((52, 52), -1, dtype=np.int64)
+    _first, _second = np.triu_indices(52, k=1)
+    combo_index[_first, _second] = np.arange(len(_first))
+    combo_index[_second, _first] = np.arange(len(_first))
+    del _first, _second
+
+    # Compiled ranges, keyed by range string
+    _compiled: dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def parse(text: str) -> dict[str, float]:
+        """Converts a range to the weight of each class it names.
+
+        Positional arguments:
+        text (str): The range, as described in the class docstring.
+
+        Returns: A dictionary mapping class names, such as "AKs", to their
+            weights. Classes that are not named are absent.
+        """
+        if not isinstance(text, str):
+            raise TypeError(f"Positional argument text must be of type str, not {type(text)}")
+        weights: dict[str, float] = {}
+        for token in text.replace(" ", "").upper().split(","):
+            if not token:
+                continue
+            name, _, weight_text = token.partition(":")
+            try:
+                weight: float = float(weight_text) if weight_text else 1.0
+            except ValueError:
+                raise ValueError(f"Invalid weight in hand range token: {token}") from None
+            if weight < 0:
+                raise ValueError(f"Invalid weight in hand range token: {token}")
+            for hand_class in HandRange._expand(name):
+                weights[hand_class] = weight
+        return weights
+
+    @staticmethod
+    def _expand(name: str) -> list[str]:
+        # Lists the classes named by one token of a range, without its weight
+        def rank(character: str) -> int:
+            if character not in Card.ranks:
+                raise ValueError(f"Invalid hand range token: {name}")
+            return Card.ranks.index(character)
+
+        def parse_class(text: str) -> tuple:
+            # Splits a class such as "ATS" into its ranks and suitedness
+            if len(text) not in (2, 3) or (len(text) == 3 and text[2] not in "SO"):
+                raise ValueError(f"Invalid hand range token: {name}")
+            high, low = rank(text[0]), rank(text[1])
+            if high < low:
+                high, low = low, high
+            suitedness: str = text[2].lower() if len(text) == 3 else ""
+            if high == low and suitedness:
+                raise ValueError(f"Invalid hand range token: {name}")
+            return high, low, suitedness
+
+        def class_names(high: int, low: int, suitedness: str) -> list[str]:
+            if high == low:
+                return [Card.ranks[high] * 2]
+            return [Card.ranks[high] + Card.ranks[low] + suit for suit in (suitedness or "so")]
+
+        if name.endswith("+"):
+            high, low, suitedness = parse_class(name[:-1])
+            if high == low:
+                return [Card.ranks[pair] * 2 for pair in range(low, len(Card.ranks))]
+            return [hand_class for kicker in range(low, high) for hand_class in class_names(high, kicker, suitedness)]
+        if "-" in name:
+            start, _, end = name.partition("-")
+            high1, low1, suitedness1 = parse_class(start)
+            high2, low2, suitedness2 = parse_class(end)
+            pairs: bool = high1 == low1
+            if pairs != (high2 == low2) or (not pairs and (high1 != high2 or suitedness1 != suitedness2)):
+                raise ValueError(f"Invalid hand range token: {name}")
+            if pairs:
+                return [Card.ranks[pair] * 2 for pair in range(min(low1, low2), max(low1, low2) + 1)]
+            return [hand_class for kicker in range(min(low1, low2), max(low1, low2) + 1)
+                    for hand_class in class_names(high1, kicker, suitedness1)]
+        return class_names(*parse_class(name))
+
+    @staticmethod
+    def compile(text: str) -> np.ndarray:
+        """Converts a range to the weight of each of the 1,326 holdings. The
+            result is cached by range string and must not be modified.
+
+        Positional arguments:
+        text (str): The range, as described in the class docstring.
+
+        Returns: A read-only float array of length 1326, indexed as per
+            combo_index.
+        """
+        weights: np.ndarray = HandRange._compiled.get(text)
+        if weights is not None:
+            return weights
+
+        class_weights: dict[str, float] = HandRange.parse(text)
+        first, second = np.triu_indices(52, k=1)
+        high: np.ndarray = np.maximum(first, second) // 4
+        low: np.ndarray = np.minimum(first, second) // 4
+        suited: np.ndarray = (first & 3) == (second & 3)
+        names: list[str] = [
+            Card.ranks[h] + Card.ranks[l] + ("" if h == l else "s" if s else "o")
+            for h, l, s in zip(high.tolist(), low.tolist(), suited.tolist())
+        ]
+        weights = np.array([class_weights.get(name, 0.0) for name in names])
+        weights.flags.writeable = False
+        HandRange._compiled[text] = weights
+        return weights
+
+    @staticmethod
+    def holding_weights(text: str, first_ids: np.ndarray, second_ids: np.ndarray) -> np.ndarray:
+        """Looks up the weight of each holding in a range.
+
+        Positional arguments:
+        text (str): The range, as described in the class docstring.
+        first_ids (np.ndarray): The card id of each holding's first card.
+        second_ids (np.ndarray): The card id of each holding's second card.
+
+        Returns: A float array with the weight of each holding.
+        """
+        return HandRange.compile(text)[HandRange.combo_index[first_ids, second_ids]]
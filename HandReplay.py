@@ -0,0 +1,212 @@
+from Card import Card
+from Stats import Stats
+from Table import Table
+import json
+import queue
+import threading
+
+class HandReplay:
+    # The streets of a hand, with the number of community cards each deals
+    streets: dict[str, int] = {"preflop": 0, "flop": 3, "turn": 1, "river": 1}
+
+    def __init__(self, opponents: list[int], n_samples: int = 10000, seed: int = None, ranges = None,
+                 prefetch: int = 0, stats: Stats = None):
+        """Replays recorded hand histories through a Table, street by street.
+
+        A history is either JSON lines, one hand per line, such as
+            {"id": "42", "player": "AS KD", "flop": "QS 7H 2D", "turn": "9C",
+             "river": "KH"}
+            or plain text, hands separated by blank lines, such as
+            Hand: 42
+            Player: AS KD
+            Flop: QS 7H 2D
+            Turn: 9C
+            River: KH
+        Cards are written as per Card.parse_many. "id", "flop",
+            "turn" and "river" may be missing, for a hand that ended early,
+            and "opponents" (a number, or a list in JSON) overrides the
+            replay's numbers of opponents for one hand. In plain text, keys
+            are case-insensitive, "Hole" may stand for "Player", and other
+            lines and lines starting with "#" are ignored.
+
+        The file is read one hand at a time, and each street's result is
+            yielded as soon as it is computed, so memory use does not depend
+            on the size of the file.
+
+        Positional arguments:
+        opponents (list[int]): The numbers of opponents to analyze each
+            street for, as per Table.shared_probabilities.
+
+        Optional arguments:
+        n_samples (int): The number of samples per analysis. Defaults to
+            10000.
+        seed (int): Seeds every analysis, as per Table.probabilities.
+            Defaults to None.
+        ranges (str | list[str]): The opponents' ranges, as per
+            Table.probabilities.
+        prefetch (int): If positive, a background thread reads and parses
+            up to this many hands ahead of the analysis. Defaults to 0,
+            which reads each hand when it is needed.
+        stats (Stats): Collects timings and counters across the replay, as
+            per Table.probabilities.
+
+        Instance variables:
+        The arguments, plus:
+        table (Table): The Table the hands are replayed through.
+
+        Methods:
+        parse: Reads hands from lines of a history.
+        hands: Reads the hands of a history file.
+        replay: Analyzes every street of every hand in a history file.
+        """
+        if not isinstance(opponents, list):
+            raise TypeError(f"Positional argument opponents must be of type list, not {type(opponents)}")
+        if not isinstance(prefetch, int):
+            raise TypeError(f"Optional argument prefetch must be of type int, not {type(prefetch)}")
+        self.opponents: list[int] = opponents
+        self.n_samples: int = n_samples
+        self.seed: int = seed
+        self.ranges = ranges
+        self.prefetch: int = prefetch
+        self.stats: Stats = stats
+        self.table: Table = Table()
+
+    @staticmethod
+    def parse(lines):
+        """Reads hands from an iterable of lines, such as an open file,
+            consuming it only as far as the hands read.
+
+        Returns: A generator of dictionaries with the hand's "id" (or None),
+            the player's two Cards ("player"), the community Cards of each
+            street dealt ("flop", "turn" and "river"), and the numbers of
+            opponents ("opponents", or None).
+        """
+        fields: dict = {}
+        number: int = 0
+        for line in lines:
+            line = line.strip()
+            if line.startswith("{"):
+                # A JSON line ends any plain-text hand before it
+                if fields:
+                    number += 1
+                    yield HandReplay._make_hand(fields, number)
+                    fields = {}
+                number += 1
+                yield HandReplay._make_hand(json.loads(line), number)
+            elif not line:
+                if fields:
+                    number += 1
+                    yield HandReplay._make_hand(fields, number)
+                    fields = {}
+            elif not line.startswith("#") and ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip().lower()
+                if key in ("hand", "id", "player", "hole", "flop", "turn", "river", "opponents"):
+                    fields[key] = value.strip()
+        if fields:
+            number += 1
+            yield HandReplay._make_hand(fields, number)
+
+    @staticmethod
+    def _make_hand(fields: dict, number: int) -> dict:
+        player = fields.get("player", fields.get("hole"))
+        if player is None:
+            raise ValueError(f"Hand {number} of the history has no player cards")
+        hand: dict = {"id": fields.get("id", fields.get("hand")), "player": HandReplay._cards(player),
+                      "opponents": None}
+        if len(hand["player"]) != 2:
+            raise ValueError(f"Hand {number} of the history must give the player 2 cards, not {len(hand['player'])}")
+        for street, size in HandReplay.streets.items():
+            if size and fields.get(street):
+                hand[street] = HandReplay._cards(fields[street])
+                if len(hand[street]) != size:
+                    raise ValueError(f"Hand {number} of the history must have {size} card(s) on the {street}, "
+                                     f"not {len(hand[street])}")
+        opponents = fields.get("opponents")
+        if isinstance(opponents, str) and opponents:
+            opponents = [int(n) for n in opponents.replace(",", ";").split(";") if n.strip()]
+        elif isinstance(opponents, int):
+            opponents = [opponents]
+        hand["opponents"] = opponents or None
+        return hand
+
+    @staticmethod
+    def _cards(value) -> list[Card]:
+        if isinstance(value, list):
+            value = " ".join(value)
+        return Card.parse_many(value)
+
+    def hands(self, path: str):
+        """Reads the hands of a history file, as per parse, through a
+            background thread if prefetch is positive.
+        """
+        if self.prefetch <= 0:
+            with open(path) as file:
+                yield from HandReplay.parse(file)
+            return
+
+        # The reader stops at the end of the file, on an error, or when the
+        # consumer closes this generator early.
+        hands: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        stop: threading.Event = threading.Event()
+        done: object = object()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    hands.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def read() -> None:
+            try:
+                with open(path) as file:
+                    for hand in HandReplay.parse(file):
+                        if not put(hand):
+                            return
+            except Exception as error:
+                put(error)
+                return
+            put(done)
+
+        reader: threading.Thread = threading.Thread(target=read, daemon=True)
+        reader.start()
+        try:
+            while True:
+                item = hands.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            reader.join()
+
+    def replay(self, path: str):
+        """Replays every hand of a history file, analyzing each street once
+            its community cards are dealt.
+
+        Positional arguments:
+        path (str): The history file.
+
+        Returns: A generator of dictionaries, one per street of each hand,
+            with the hand's "id", the "street" ("preflop", "flop", "turn" or
+            "river"), the player's Cards ("player"), the community Cards
+            ("board"), and the result of Table.shared_probabilities
+            ("results").
+        """
+        for hand in self.hands(path):
+            self.table.manual_game(*hand["player"])
+            opponents: list[int] = hand["opponents"] or self.opponents
+            for street in HandReplay.streets:
+                if street != "preflop":
+                    if street not in hand:
+                        break
+                    self.table.add_community(*hand[street])
+                results: dict = self.table.shared_probabilities(list(opponents), self.n_samples, seed=self.seed,
+                                                                ranges=self.ranges, stats=self.stats)
+                yield {"id": hand["id"], "street": street, "player": list(self.table.player),
+                       "board": list(self.table.community_cards), "results": results}
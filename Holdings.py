@@ -0,0 +1,109 @@
+from Card import Card
+from Deck import Deck
+from HandEvaluator import HandEvaluator
+import numpy as np
+
+class Holdings:
+    def __init__(self, deck, community_cards: list[Card]):
+        """Evaluator state for every holding an opponent could have, kept up
+            to date as community cards are dealt.
+
+        Each holding (pair of cards left in the deck) keeps its rank key,
+            suit key and suit masks, as per HandEvaluator, for its two cards
+            plus the community cards. Dealing a community card drops the
+            holdings that contain it and adds the card to the keys of the
+            rest, so a new street costs one card's worth of work per holding
+            instead of a full re-evaluation.
+
+        Positional arguments:
+        deck (Iterable[Card]): The cards the holdings are made from.
+        community_cards (list[Card]): The community cards dealt so far.
+
+        Instance variables:
+        card_ids (np.ndarray): The ids of the cards left in the deck, in
+            ascending order.
+        first_ids (np.ndarray): For each holding, the id of its first card.
+        second_ids (np.ndarray): For each holding, the id of its second card.
+        rank_keys (np.ndarray): For each holding, its rank key.
+        suit_keys (np.ndarray): For each holding, its suit key.
+        suit_masks (np.ndarray): For each holding, the rank masks of its
+            four suits.
+        evaluated (int): The number of holdings rated by strengths so far.
+
+        Methods:
+        add_card: Deals a community card.
+        strengths: Rates every holding with the community cards.
+        positions: Locates each holding's cards among card_ids.
+        """
+        if HandEvaluator.batch_tables is None:
+            HandEvaluator._build_batch_tables()
+        tables: dict = HandEvaluator.batch_tables
+
+        # A Deck lists its ids without finishing a pending shuffle.
+        ids: list[int] = deck.card_ids() if isinstance(deck, Deck) else sorted(card.id for card in deck)
+        self.card_ids: np.ndarray = np.array(ids, dtype=np.int64)
+        first, second = np.triu_indices(len(self.card_ids), k=1)
+        self.first_ids: np.ndarray = self.card_ids[first]
+        self.second_ids: np.ndarray = self.card_ids[second]
+
+        community: list[int] = [card.id for card in community_cards]
+        self.rank_keys: np.ndarray = tables["rank_keys"][self.first_ids] + tables["rank_keys"][self.second_ids] \
+            + tables["rank_keys"][community].sum()
+        self.suit_keys: np.ndarray = tables["suit_keys"][self.first_ids] + tables["suit_keys"][self.second_ids] \
+            + tables["suit_keys"][community].sum()
+        self.suit_masks: np.ndarray = np.zeros((len(first), 4), dtype=np.int64)
+        rows: np.ndarray = np.arange(len(first))
+        self.suit_masks[rows, self.first_ids & 3] |= tables["rank_bits"][self.first_ids]
+        self.suit_masks[rows, self.second_ids & 3] |= tables["rank_bits"][self.second_ids]
+        for card_id in community:
+            self.suit_masks[:, card_id & 3] |= tables["rank_bits"][card_id]
+
+        self.evaluated: int = 0
+        self._strengths: tuple[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.first_ids)
+
+    def add_card(self, card: Card) -> None:
+        """Deals a community card: drops the holdings that contain it and adds
+            it to every other holding.
+
+        Positional arguments:
+        card (Card): The new community card. Must be in card_ids.
+
+        Returns: None
+        """
+        if not isinstance(card, Card):
+            raise TypeError(f"Positional argument card must be of type Card, not {type(card)}")
+        card_id: int = card.id
+        if card_id not in self.card_ids:
+            raise ValueError(f"Card {card} not in deck.")
+        tables: dict = HandEvaluator.batch_tables
+
+        keep: np.ndarray = (self.first_ids != card_id) & (self.second_ids != card_id)
+        self.card_ids = self.card_ids[self.card_ids != card_id]
+        self.first_ids = self.first_ids[keep]
+        self.second_ids = self.second_ids[keep]
+        self.rank_keys = self.rank_keys[keep] + tables["rank_keys"][card_id]
+        self.suit_keys = self.suit_keys[keep] + tables["suit_keys"][card_id]
+        self.suit_masks = self.suit_masks[keep]
+        self.suit_masks[:, card_id & 3] |= tables["rank_bits"][card_id]
+        self._strengths = None
+
+    def strengths(self) -> tuple[np.ndarray]:
+        """Rates every holding together with the community cards. The result
+            is kept until the next add_card.
+
+        Returns: A tuple of two arrays, each holding's best_hand()["value"]
+            and best_hand()["level"].
+        """
+        if self._strengths is None:
+            self._strengths = HandEvaluator.rate_batch(self.rank_keys, self.suit_keys, self.suit_masks)
+            self.evaluated += len(self)
+        return self._strengths
+
+    def positions(self) -> tuple[np.ndarray]:
+        """Returns the position of each holding's first and second card in
+            card_ids, as used by Simulator.
+        """
+        return np.searchsorted(self.card_ids, self.first_ids), np.searchsorted(self.card_ids, self.second_ids)
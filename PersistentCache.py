@@ -0,0 +1,157 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+
+class PersistentCache:
+    # Version of the file layout and of the value encoding
+    schema_version: int = 1
+
+    def __init__(self, path: str, maxsize: int = 100000, timeout: float = 30.0):
+        """A result cache kept in a SQLite file, so results survive the
+            process and can be shared by processes on the same machine.
+
+        The file is opened in write-ahead-log mode, so readers do not block
+            the writer and concurrent processes can use it safely. Every
+            lookup records when the entry was last used, and once the file
+            holds more than maxsize entries, the least recently used are
+            deleted.
+
+        Keys and values may be built from None, bools, numbers, strings,
+            tuples, lists, dictionaries and NumPy arrays; they are stored as
+            JSON.
+
+        Positional arguments:
+        path (str): The location of the SQLite file. It is created if
+            missing.
+
+        Optional arguments:
+        maxsize (int): The most entries to keep. Defaults to 100000.
+        timeout (float): How long to wait, in seconds, when another process
+            holds the write lock. Defaults to 30.
+
+        Instance variables:
+        path, maxsize, timeout: As above.
+        hits (int): The number of successful lookups by this object.
+        misses (int): The number of failed lookups by this object.
+
+        Methods:
+        get: Looks up a key.
+        put: Stores a value.
+        clear: Removes every entry.
+        """
+        if not isinstance(path, (str, os.PathLike)):
+            raise TypeError(f"Positional argument path must be of type str, not {type(path)}")
+        if not isinstance(maxsize, int):
+            raise TypeError(f"Optional argument maxsize must be of type int, not {type(maxsize)}")
+        if maxsize < 1:
+            raise ValueError(f"Optional argument maxsize must be at least 1, not {maxsize}")
+        self.path: str = os.fspath(path)
+        self.maxsize: int = maxsize
+        self.timeout: float = timeout
+        self.hits: int = 0
+        self.misses: int = 0
+        self._local: threading.local = threading.local()
+
+        connection: sqlite3.Connection = self._connection()
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS entries "
+                               "(key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            version: int = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != PersistentCache.schema_version:
+                # Entries written by another version cannot be trusted
+                connection.execute("DELETE FROM entries")
+                connection.execute(f"PRAGMA user_version = {PersistentCache.schema_version}")
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared between threads or across a
+        # fork, so each thread of each process opens its own.
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection: sqlite3.Connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def __contains__(self, key) -> bool:
+        row = self._connection().execute("SELECT 1 FROM entries WHERE key = ?",
+                                         (PersistentCache._dumps(key),)).fetchone()
+        return row is not None
+
+    def get(self, key, default=None):
+        """Returns the value stored under key, marking it as recently used,
+            or default if there is none.
+        """
+        connection: sqlite3.Connection = self._connection()
+        encoded_key: str = PersistentCache._dumps(key)
+        with connection:
+            row = connection.execute("SELECT value FROM entries WHERE key = ?", (encoded_key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            connection.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), encoded_key))
+        self.hits += 1
+        return PersistentCache._loads(row[0])
+
+    def put(self, key, value) -> None:
+        """Stores value under key, evicting the least recently used entries
+            if the cache is full.
+        """
+        connection: sqlite3.Connection = self._connection()
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO entries (key, value, last_access) VALUES (?, ?, ?)",
+                               (PersistentCache._dumps(key), PersistentCache._dumps(value), time.time()))
+            excess: int = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.maxsize
+            if excess > 0:
+                connection.execute("DELETE FROM entries WHERE key IN "
+                                   "(SELECT key FROM entries ORDER BY last_access LIMIT ?)", (excess,))
+
+    def clear(self) -> None:
+        """Removes every entry and resets hits and misses."""
+        connection: sqlite3.Connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM entries")
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _encode(value):
+        # Converts value to plain JSON types, tagging those JSON lacks
+        if isinstance(value, np.ndarray):
+            return {"array": value.tolist(), "dtype": str(value.dtype)}
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, tuple):
+            return {"tuple": [PersistentCache._encode(item) for item in value]}
+        if isinstance(value, list):
+            return [PersistentCache._encode(item) for item in value]
+        if isinstance(value, dict):
+            return {"dict": [[PersistentCache._encode(k), PersistentCache._encode(v)] for k, v in value.items()]}
+        return value
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, list):
+            return [PersistentCache._decode(item) for item in value]
+        if isinstance(value, dict):
+            if "array" in value:
+                return np.array(value["array"], dtype=value["dtype"])
+            if "tuple" in value:
+                return tuple(PersistentCache._decode(item) for item in value["tuple"])
+            return {PersistentCache._decode(k): PersistentCache._decode(v) for k, v in value["dict"]}
+        return value
+
+    @staticmethod
+    def _dumps(value) -> str:
+        return json.dumps(PersistentCache._encode(value), separators=(",", ":"))
+
+    @staticmethod
+    def _loads(text: str):
+        return PersistentCache._decode(json.loads(text))
@@ -1,8 +1,10 @@
 from Card import Card
-import re
+from HandEvaluator import HandEvaluator
+from operator import attrgetter
 
 class PokerHand:
     possible_ranks = 'EDCBA98765432'
+    use_tables: bool = True
 
     def __init__(self, cards: list[Card]):
         """Represents a hand of Card objects in Texas Holdem.
@@ -13,10 +15,25 @@ class PokerHand:
         Class variables:
         possible_ranks (str): 'EDCBA98765432'. Represents the hexadecimal 
             values of the cards 2-A in descending order.
+        use_tables (bool): Whether best_hand uses HandEvaluator's lookup 
+            tables (the default) or runs the detector methods top-down, 
+            which needs no tables. Both give identical results. Hands of 
+            more than seven cards always use the detector methods.
 
         Instance variables:
         cards (list[Card]): The cards, represented as Card objects, that make 
-            up the hand. Should include community cards.
+            up the hand. Should include community cards. A sorted copy of 
+            the list passed in, which is left unchanged.
+        rank_counts (list[int]): The number of cards of each rank, indexed 
+            by value-2.
+        count_masks (list[int]): 13-bit rank masks. Bit r of count_masks[i] 
+            is set if the hand has at least i+1 cards of value r+2.
+        suit_masks (list[int]): 13-bit rank masks of the cards in each suit, 
+            indexed by Card.suit_int.
+        rank_key (int): The hand's rank key, as per HandEvaluator.
+        suit_key (int): The hand's suit key, as per HandEvaluator.
+
+        Properties:
         cards_string (str): A string containing the hexadecimal values of the
             cards in the hand in descending order.
         hearts (tuple[str]): A list containing the hexadecimal values of the 
@@ -33,8 +50,9 @@ class PokerHand:
             its equivalent card.
 
         Instance methods:
-        create_string: Initializes or modifies the cards_string, hearts, 
-            diamonds, clubs, and spades variables.
+        create_string: Sorts the cards and rebuilds the rank counts and 
+            masks in a single pass.
+        append: Adds a card, updating the rank counts and masks in place.
         straight_flush: Determines whether a straight flush is present in the 
             hand and, if so, returns a hexadecimal int representing its 
             strength.
@@ -67,21 +85,22 @@ class PokerHand:
             raise TypeError(f"Positional argument cards must be of type list, not {type(cards)}")
         if any(not isinstance(card, Card) for card in cards):
             raise ValueError("All elements of positional argument cards must be of type Card.")
-        # Cards as they get introduced, no order
-        self.cards: list[Card] = cards
-        self.cards.sort(reverse=True)
+        # A copy, since create_string sorts it
+        self.cards: list[Card] = list(cards)
         self.create_string()
     
     def create_string(self) -> None:
-        """Mutates the cards_string, hearts, diamonds, clubs, and spades 
-            variables to list the hexadecimal values of each card in 
-            descending order of strength.
+        """Sorts the cards in descending order of strength and rebuilds the 
+            rank_counts, count_masks, suit_masks, rank_key and suit_key 
+            variables in a single pass over them.
         
         Example:
             hand = PokerHand([Card('5D'), Card('QH'), Card('6S'), Card('3D')])
             hand.create_string()
             hand.cards_string
                 -> 'C653'
+            hand.count_masks[0]
+                -> 0b10000011010 (bits for Q, 6, 5 and 3)
             hand.hearts
                 -> ('C',)
             hand.diamonds
@@ -95,14 +114,51 @@ class PokerHand:
         
         Output: None
         """
-        self.cards.sort(reverse=True)
-        self.cards_string = ''.join([card.value for card in self.cards])
+        self.cards.sort(key=PokerHand._card_value, reverse=True)
+        self.rank_counts: list[int] = [0]*13
+        self.count_masks: list[int] = [0]*4
+        self.suit_masks: list[int] = [0]*4
+        self.rank_key: int = 0
+        self.suit_key: int = 0
+        for card in self.cards:
+            self._add_card(card)
+
+    _card_value = attrgetter('rank_int')
+
+    def _add_card(self, card: Card) -> None:
+        # Updates the counts, masks and keys for one more card.
+        rank: int = card.rank_int - 2
+        count: int = self.rank_counts[rank]
+        self.rank_counts[rank] = count + 1
+        self.count_masks[count] |= 1 << rank
+        self.suit_masks[card.suit_int] |= 1 << rank
+        self.rank_key += HandEvaluator.rank_keys[card.id]
+        self.suit_key += HandEvaluator.suit_keys[card.id]
+
+    @property
+    def cards_string(self) -> str:
+        return ''.join([card.value for card in self.cards])
+
+    @property
+    def hearts(self) -> tuple[str]:
+        return tuple([card.value for card in self.cards if card.suit == 'H'])
+
+    @property
+    def diamonds(self) -> tuple[str]:
+        return tuple([card.value for card in self.cards if card.suit == 'D'])
+
+    @property
+    def clubs(self) -> tuple[str]:
+        return tuple([card.value for card in self.cards if card.suit == 'C'])
+
+    @property
+    def spades(self) -> tuple[str]:
+        return tuple([card.value for card in self.cards if card.suit == 'S'])
+
+    def _values(self) -> list[int]:
+        # The card values in descending order
+        return [card.rank_int for card in self.cards]
 
-        self.hearts = tuple([card.value for card in self.cards if card.suit == 'H'])
-        self.diamonds = tuple([card.value for card in self.cards if card.suit == 'D'])
-        self.clubs = tuple([card.value for card in self.cards if card.suit == 'C'])
-        self.spades = tuple([card.value for card in self.cards if card.suit == 'S'])
-    
     # The following functions evaluate for the possibility of hands
     # and will return a hexadecimal int under this pattern:
     # Position 1: strength of hand (0=none, 1=pair, ...)
@@ -124,57 +180,12 @@ class PokerHand:
             descending order. If a straight flush is not found, returns 0.
         """
 
-        count = 0
-        high = None
-        
-        for i, value in enumerate(self.possible_ranks):
-            if value in self.hearts:
-                if high is None: high = value
-                count += 1
-                if count == 5: return int('8'+high+''.join(self.possible_ranks[i-3:i+1]), 16)
-            else:
-                count = 0
-                high = None
-        if (count == 4) and ('E' in self.hearts): return int('854321', 16)
-
-        count = 0
-        high = None
-        
-        for i, value in enumerate(self.possible_ranks):
-            if value in self.diamonds:
-                if high is None: high = value
-                count += 1
-                if count == 5: return int('8'+high+''.join(self.possible_ranks[i-3:i+1]), 16)
-            else:
-                count = 0
-                high = None
-        if (count == 4) and ('E' in self.diamonds): return int('854321', 16)
-
-        count = 0
-        high = None
-        
-        for i, value in enumerate(self.possible_ranks):
-            if value in self.clubs:
-                if high is None: high = value
-                count += 1
-                if count == 5: return int('8'+high+''.join(self.possible_ranks[i-3:i+1]), 16)
-            else:
-                count = 0
-                high = None
-        if (count == 4) and ('E' in self.clubs): return int('854321', 16)
-
-        count = 0
-        high = None
-        
-        for i, value in enumerate(self.possible_ranks):
-            if value in self.spades:
-                if high is None: high = value
-                count += 1
-                if count == 5: return int('8'+high+''.join(self.possible_ranks[i-3:i+1]), 16)
-            else:
-                count = 0
-                high = None
-        return int('854321', 16) if (count == 4) and ('E' in self.spades) else 0
+        for mask in self.suit_masks:
+            if mask.bit_count() >= 5:
+                high = HandEvaluator._straight_high(mask)
+                if high:
+                    return HandEvaluator._hex_value(8, HandEvaluator._straight_values(high))
+        return 0
     
     def four_of_a_kind(self) -> int:
         """Determines whether the hand contains a four-of-a-kind and, if it 
@@ -189,17 +200,13 @@ class PokerHand:
             last digit is the numeric value of the kicker. If a 
             four-of-a-kind is not found, returns 0.
         """
-        
-        four_of_a_kind: re.Match = re.search(r'(.)\1\1\1', self.cards_string)
-        if four_of_a_kind is None:
+
+        quads: int = self.count_masks[3]
+        if not quads:
             return 0
-        card = four_of_a_kind.group(1)
-        if len(self.cards_string) == 4:
-            return int(f'7{card}{card}{card}{card}', 16)
-        for char in self.cards_string:
-            if not char == card:
-                return int(f'7{card}{card}{card}{card}{char}', 16)
-        return 0
+        card: int = quads.bit_length() + 1
+        kickers = [value for value in self._values() if value != card][:1]
+        return HandEvaluator._hex_value(7, [card]*4 + kickers)
 
     def full_house(self) -> int:
         """Determines whether the hand contains a full house and, if it does, 
@@ -214,27 +221,17 @@ class PokerHand:
             descending order. If a full house is not found, returns 0.
         """
 
-        full_house_2_3: re.Match = re.search(r'(.)\1.*?(.)\2\2', self.cards_string)
-        full_house_3_2: re.Match = re.search(r'(.)\1\1.*?(.)\2', self.cards_string)
-        if (full_house_2_3 is None) and (full_house_3_2 is None):
+        trips: int = self.count_masks[2]
+        if not trips:
             return 0
-        if (full_house_2_3 is not None) and (full_house_3_2 is None):
-            high = full_house_2_3.group(2)
-            low = full_house_2_3.group(1)
-        elif (full_house_3_2 is not None) and (full_house_2_3 is None):
-            high = full_house_3_2.group(1)
-            low = full_house_3_2.group(2)
-        elif int(full_house_2_3.group(2), 16) >= int(full_house_3_2.group(1), 16):
-            # If the two three-of-a-kinds are equal, we know the first full
-            # house is higher because its pair comes before the value while
-            # the other's pair comes after the value, and cards earlier in the
-            # string are greater.
-            high = full_house_2_3.group(2)
-            low = full_house_2_3.group(1)
-        elif int(full_house_3_2.group(1), 16) > int(full_house_2_3.group(2), 16):
-            high = full_house_3_2.group(1)
-            low = full_house_3_2.group(2)
-        return int(f'6{high}{high}{high}{low}{low}', 16)
+        high: int = trips.bit_length() - 1
+        # The pair can come from a second three-of-a-kind.
+        pairs: int = self.count_masks[1] & ~(1 << high)
+        if not pairs:
+            return 0
+        low: int = pairs.bit_length() - 1
+        return HandEvaluator._hex_value(6, [high+2]*3 + [low+2]*2)
+
 
 
     def flush(self) -> int:
@@ -249,14 +246,14 @@ class PokerHand:
             order. If a flush is not found, returns 0.
         """
 
-        if len(self.hearts) >= 5:
-            return int('5'+''.join(self.hearts)[:5], 16)
-        if len(self.diamonds) >= 5:
-            return int('5'+''.join(self.diamonds)[:5], 16)
-        if len(self.clubs) >= 5:
-            return int('5'+''.join(self.clubs)[:5], 16)
-        if len(self.spades) >= 5:
-            return int('5'+''.join(self.spades)[:5], 16)
+        for mask in self.suit_masks:
+            if mask.bit_count() >= 5:
+                values = []
+                while len(values) < 5:
+                    top: int = mask.bit_length() - 1
+                    values.append(top + 2)
+                    mask ^= 1 << top
+                return HandEvaluator._hex_value(5, values)
         return 0
     
     def straight(self) -> int:
@@ -272,20 +269,9 @@ class PokerHand:
             descending order. If a straight is not found, returns 0.
         """
 
-        count = 0
-        high = None
-
-        for i, rank in enumerate(self.possible_ranks):
-            if rank in self.cards_string:
-                if high is None: high = rank
-                count += 1
-                if count == 5: return int('4'+high+''.join(self.possible_ranks[i-3:i+1]), 16)
-            else:
-                count = 0
-                high = None
-            
-        # The for loop misses bottom ace, so this checks for it.
-        return int('454321', 16) if (count == 4) and ('E' in self.cards_string) else 0
+        high: int = HandEvaluator._straight_high(self.count_masks[0])
+        return HandEvaluator._hex_value(4, HandEvaluator._straight_values(high)) if high else 0
+
 
     def three_of_kind(self) -> int:
         """Determines whether the hand contains a three-of-a-kind and, if it 
@@ -301,16 +287,15 @@ class PokerHand:
             descending order. If a three-of-a-kind is not found, returns 0.
         """
 
-        # Split the string with the three of kind as the delimiter
-        split = re.split(r'([2-9ABCDE])\1\1', self.cards_string, maxsplit=1)
-        if(len(split) < 3): return 0 # No match
-        # Three of kind found - result should have 3 elements
-        # split[0] = substring before the top three of kind
-        # split[1] = rank of the three of kind (single character)
-        # split[2] = substring following the three of kind
-        threeofkind: str = split[1]*3
-        kickers: str = (split[0]+split[2])[0:2]
-        return int('3'+threeofkind+kickers, 16)
+        trips: int = self.count_masks[2]
+        if not trips:
+            return 0
+        card: int = trips.bit_length() + 1
+        # Kickers are the best two of the other cards.
+        values: list[int] = self._values()
+        i: int = values.index(card)
+        kickers: list[int] = (values[:i] + values[i+3:])[:2]
+        return HandEvaluator._hex_value(3, [card]*3 + kickers)
 
     def two_pair(self) -> int:
         """Determines whether the hand contains a two-pair and, if it does, 
@@ -325,17 +310,18 @@ class PokerHand:
             the kicker. If a two-pair is not found, returns 0.
         """
 
-        two_pair: re.Match = re.search(r'(.)\1.*?(.)\2', 
-                                       self.cards_string)
-        if two_pair is not None:
-            highest: str = two_pair.group(1)
-            second: str = two_pair.group(2)
-
-            for char in self.cards_string:
-                if (not char == two_pair.group(1)) and (not char == two_pair.group(2)):
-                    return int(f'2{highest}{highest}{second}{second}{char}', 16)
-            return int(f'2{highest}{highest}{second}{second}', 16) 
-        return 0
+        pairs: int = self.count_masks[1]
+        if not pairs:
+            return 0
+        highest: int = pairs.bit_length() - 1
+        # A four-of-a-kind counts as two pairs of the same rank.
+        if not self.count_masks[3] & (1 << highest):
+            pairs ^= 1 << highest
+        if not pairs:
+            return 0
+        second: int = pairs.bit_length() - 1
+        kickers = [value for value in self._values() if value not in (highest+2, second+2)][:1]
+        return HandEvaluator._hex_value(2, [highest+2]*2 + [second+2]*2 + kickers)
 
     def pair(self) -> int:
         """Determines whether the hand contains a pair and, if it does, how 
@@ -352,16 +338,15 @@ class PokerHand:
             0.
         """
 
-        # Split the string with the top pair as the delimiter
-        split = re.split(r'([2-9ABCDE])\1', self.cards_string, maxsplit=1)
-        if(len(split) < 3): return 0 # No match
-        # Pair found - result should have 3 elements
-        # split[0] = substring before the top pair
-        # split[1] = rank of the pair (single character)
-        # split[2] = substring following the top pair
-        pair: str = split[1]*2
-        kickers: str = (split[0]+split[2])[0:3]
-        return int('1'+pair+kickers, 16)
+        pairs: int = self.count_masks[1]
+        if not pairs:
+            return 0
+        card: int = pairs.bit_length() + 1
+        # Kickers are the best three of the other cards.
+        values: list[int] = self._values()
+        i: int = values.index(card)
+        kickers: list[int] = (values[:i] + values[i+2:])[:3]
+        return HandEvaluator._hex_value(1, [card]*2 + kickers)
 
     def high_card(self) -> int:
         """Determines the strength of the hand, assuming that it could only 
@@ -373,8 +358,9 @@ class PokerHand:
             of the hand. The (omitted) first digit is "0". The next five 
             digits are the cards that make up the hand, in descending order.
         """
-        return int(self.cards_string[:5], 16)
+        return HandEvaluator._hex_value(0, self._values()[:5])
       
+
     def best_hand(self) -> dict:
         """Determines the strength of the hand, accounting for both hand type 
             and kickers. This method is constructed such that one hand's 
@@ -399,6 +385,12 @@ class PokerHand:
                 decreasing order of strength.
         """
 
+        # The tables cover hands of up to seven cards; larger hands fall 
+        # back to the detector methods.
+        if PokerHand.use_tables and len(self.cards) <= 7:
+            level, value = HandEvaluator.rate(self.rank_key, self.suit_key, self.suit_masks)
+            return {"level": level, "value": value}
+
         # Find the strongest hand by testing top-down
         test = self.straight_flush()
         if test != 0: return {"level": 8, "value": test}
@@ -450,6 +442,9 @@ class PokerHand:
     def append(self, card: Card) -> None:
         if not isinstance(card, Card):
             raise TypeError(f"Positional argument card must be of type Card, not {type(Card)}")
-        self.cards.append(card)
-        self.cards.sort(reverse=True)
-        self.create_string()
+        # Inserts after any cards of the same value, like a stable sort would.
+        i: int = 0
+        while i < len(self.cards) and self.cards[i].rank_int >= card.rank_int:
+            i += 1
+        self.cards.insert(i, card)
+        self._add_card(card)
@@ -0,0 +1,147 @@
+from Card import Card
+import json
+import numpy as np
+import os
+
+class PreflopTable:
+    """Precomputed Table.probabilities results for every starting hand.
+
+    Before the flop, results depend only on the player's hole cards up to a
+    relabeling of suits, so the 1,326 possible starting hands fall into 169
+    classes: 13 pairs ("QQ"), 78 suited hands ("AKs") and 78 offsuit hands
+    ("AKo"). The table stores the outcome counts of each class for 1 to 9
+    opponents. Looking up a player's exact cards means finding their class,
+    since every suit assignment in a class has the same result.
+
+    The table is generated by running this file (see generate) and saved as
+    JSON next to it. It is loaded the first time it is needed, and ignored
+    if its version does not match PreflopTable.version, e.g. after a change
+    to the simulation that would make it stale.
+
+    Class variables:
+    version (int): The format and simulation version of the table.
+    path (str): The location of the table on disk.
+    max_opponents (int): The largest number of opponents stored.
+
+    Static methods:
+    hand_class: Converts two hole cards to their class name.
+    hand_classes: Lists all 169 class names.
+    lookup: Returns the stored counts for two hole cards.
+    load: Reads the table from disk.
+    generate: Computes the table and writes it to disk.
+    """
+
+    version: int = 2
+    path: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop_table.json")
+    max_opponents: int = 9
+
+    # The loaded entries, keyed by class name. None until loaded.
+    _entries: dict = None
+
+    @staticmethod
+    def hand_class(card1: Card, card2: Card) -> str:
+        """Converts two hole cards to the name of their class, such as "QQ",
+            "AKs" or "T9o", with the higher rank first.
+        """
+        high, low = (card1, card2) if card1.rank_int >= card2.rank_int else (card2, card1)
+        if high.rank_int == low.rank_int:
+            return high.rank + low.rank
+        return high.rank + low.rank + ("s" if high.suit == low.suit else "o")
+
+    @staticmethod
+    def hand_classes() -> list[str]:
+        """Lists the names of all 169 starting hand classes."""
+        ranks: str = Card.ranks[::-1]
+        classes: list[str] = []
+        for i, high in enumerate(ranks):
+            classes.append(high + high)
+            for low in ranks[i+1:]:
+                classes.extend([high + low + "s", high + low + "o"])
+        return classes
+
+    @staticmethod
+    def lookup(card1: Card, card2: Card, opponents: int) -> tuple:
+        """Returns the stored outcome counts for the given hole cards and
+            number of opponents.
+
+        Positional arguments:
+        card1 (Card): One of the player's cards.
+        card2 (Card): The other of the player's cards.
+        opponents (int): The number of opponents.
+
+        Returns: A tuple of the counts (an array, as per
+            Simulator.categorize()), the number of samples or assignments
+            counted, the player's level, and whether the counts are exact,
+            as per Table._probability_counts. None if the table has no such
+            entry.
+        """
+        if PreflopTable._entries is None:
+            PreflopTable.load()
+        entry: dict = PreflopTable._entries.get(PreflopTable.hand_class(card1, card2))
+        if entry is None or str(opponents) not in entry["opponents"]:
+            return None
+        result: dict = entry["opponents"][str(opponents)]
+        return np.array(result["counts"]), result["total"], entry["level"], result["exact"]
+
+    @staticmethod
+    def load(path: str = None) -> None:
+        """Reads the table from disk. Leaves it empty if the file is missing
+            or was written by a different version.
+
+        Optional arguments:
+        path (str): Where to read the table from. Defaults to
+            PreflopTable.path.
+        """
+        path = PreflopTable.path if path is None else path
+        entries: dict = {}
+        if os.path.exists(path):
+            with open(path) as file:
+                data: dict = json.load(file)
+            if data.get("version") == PreflopTable.version:
+                entries = data["entries"]
+        PreflopTable._entries = entries
+
+    @staticmethod
+    def generate(path: str = None, n_samples: int = 100000, seed: int = 0) -> None:
+        """Computes the table with Table.probabilities' own engine and
+            writes it to disk.
+
+        Optional arguments:
+        path (str): Where to write the table. Defaults to PreflopTable.path.
+        n_samples (int): The number of samples for each entry that is not
+            counted exactly. Defaults to 100000.
+        seed (int): Seeds the sampling. Defaults to 0.
+        """
+        from Table import Table
+
+        path = PreflopTable.path if path is None else path
+        entries: dict = {}
+        for index, name in enumerate(PreflopTable.hand_classes()):
+            # Any suits in the class will do.
+            card1: Card = Card(name[0], "S")
+            card2: Card = Card(name[1], "S" if name.endswith("s") else "H")
+            table: Table = Table()
+            table.manual_game(card1, card2)
+            # Every number of opponents comes from one set of samples
+            results: dict = table._shared_probability_counts(
+                list(range(1, PreflopTable.max_opponents + 1)), n_samples, seed=seed*1000 + index)
+            entry: dict = {"opponents": {}}
+            for opponents, (counts, total, level, exact) in results.items():
+                entry["level"] = level
+                entry["opponents"][str(opponents)] = {"counts": counts.tolist(), "total": total, "exact": exact}
+            entries[name] = entry
+
+        with open(path, "w") as file:
+            json.dump({"version": PreflopTable.version, "n_samples": n_samples, "seed": seed,
+                       "entries": entries}, file, separators=(",", ":"))
+        PreflopTable._entries = entries
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate the precomputed preflop table.")
+    parser.add_argument("--samples", type=int, default=100000, help="samples per sampled entry")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--path", default=None, help="output file (default: next to this module)")
+    arguments = parser.parse_args()
+    PreflopTable.generate(arguments.path, arguments.samples, arguments.seed)
@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import threading
+
+class ResultCache:
+    def __init__(self, maxsize: int = 1024):
+        """A thread-safe in-memory cache that evicts its least recently used
+            entry once it holds more than maxsize entries.
+
+        Optional arguments:
+        maxsize (int): The most entries to keep. 0 disables the cache.
+            Defaults to 1024.
+
+        Instance variables:
+        maxsize (int): As above. Change it with resize.
+        hits (int): The number of successful lookups.
+        misses (int): The number of failed lookups.
+
+        Methods:
+        get: Looks up a key.
+        put: Stores a value.
+        resize: Changes maxsize, evicting entries as needed.
+        clear: Removes every entry and resets the statistics.
+        """
+        if not isinstance(maxsize, int):
+            raise TypeError(f"Optional argument maxsize must be of type int, not {type(maxsize)}")
+        if maxsize < 0:
+            raise ValueError(f"Optional argument maxsize must be at least 0, not {maxsize}")
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Returns the value stored under key, marking it as recently used,
+            or default if there is none.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value) -> None:
+        """Stores value under key, evicting the least recently used entries
+            if the cache is full.
+        """
+        with self._lock:
+            if self.maxsize == 0:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        """Changes the most entries to keep, evicting the least recently used
+            entries if there are now too many.
+        """
+        if not isinstance(maxsize, int):
+            raise TypeError(f"Positional argument maxsize must be of type int, not {type(maxsize)}")
+        if maxsize < 0:
+            raise ValueError(f"Positional argument maxsize must be at least 0, not {maxsize}")
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes every entry and resets hits and misses."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,417 @@
+from concurrent.futures import ProcessPoolExecutor
+from Stats import Stats
+import numpy as np
+
+class Simulator:
+    # Number of outcome categories, as per categorize()
+    n_categories: int = 27
+    # Upper bound on the rows drawn at once, to bound memory use
+    max_batch: int = 1 << 16
+    # Samples drawn per worker between precision checks in adaptive_counts
+    adaptive_batch: int = 1000
+    # Alias table draws tried for a seat before drawing directly from the
+    # holdings still free, in _draw
+    alias_rounds: int = 16
+
+    def __init__(self, first: np.ndarray, second: np.ndarray, values: np.ndarray,
+                 levels: np.ndarray, weights: np.ndarray, player_strength: dict):
+        """Vectorized Monte Carlo engine behind Table.probabilities.
+
+        Works on the precomputed strengths of every opponent holding (pair
+        of cards left in the deck), so that each sample is a few array
+        lookups instead of Python-level hand evaluations.
+
+        Opponents are dealt one at a time. Each seat gets a holding drawn
+            with probability proportional to its weight among the holdings 
+            that share no card with the seats before it. Draws come from an
+            alias table over the holdings with positive weight, so there is
+            no rejection of whole sets, and the cost of a sample grows 
+            linearly with the number of opponents.
+
+        Positional arguments:
+        first (np.ndarray): For each holding, the position in the deck of
+            its first card.
+        second (np.ndarray): For each holding, the position in the deck of
+            its second card. Positions run from 0 to the deck size - 1.
+        values (np.ndarray): For each holding, its best_hand()["value"]
+            together with the community cards.
+        levels (np.ndarray): For each holding, its best_hand()["level"]
+            together with the community cards.
+        weights (np.ndarray): For each holding, how likely an opponent is
+            to play it, relative to the others, as per HandRange. Holdings 
+            outside the opponent's range have weight 0. A (seats, holdings)
+            array gives each seat its own weights, in order; seats past the
+            last row use the last row.
+        player_strength (dict): The player's best_hand().
+
+        Instance variables:
+        The positional arguments, as NumPy arrays, with weights always 
+            two-dimensional, plus:
+        accept (np.ndarray): For each row of weights and each holding, 
+            whether its weight is positive.
+        deck_size (int): The number of cards the holdings are drawn from.
+
+        Methods:
+        categorize: Converts the best opponent hand of each sample to an
+            outcome category.
+        sample_counts: Draws random sets of opponent holdings and counts
+            the outcome categories of their best hands.
+        shared_counts: Answers several numbers of opponents from one set
+            of samples.
+        parallel_counts: Runs sample_counts across a pool of processes.
+        adaptive_counts: Samples in batches until the estimates reach a
+            target precision.
+        half_widths: Computes the 95% confidence interval half-width of 
+            each category's estimate.
+        n_assignments: Bounds the number of ways to deal the opponents
+            holdings, which bounds the cost of exact_counts.
+        exact_counts: Computes the exact distribution of outcome categories
+            that sample_counts estimates.
+        """
+        self.first: np.ndarray = np.asarray(first)
+        self.second: np.ndarray = np.asarray(second)
+        self.values: np.ndarray = np.asarray(values)
+        self.levels: np.ndarray = np.asarray(levels)
+        self.weights: np.ndarray = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        self.accept: np.ndarray = self.weights > 0
+        self.player_strength: dict = player_strength
+
+        self.deck_size: int = int(max(self.first.max(initial=-1), self.second.max(initial=-1))) + 1
+        # For each row of weights: the holdings with positive weight, which
+        # are the only ones drawn, a bitmask of the deck positions of each 
+        # one's cards, and their alias table
+        self._seat_tables: list[tuple[np.ndarray]] = []
+        for row, accept in zip(self.weights, self.accept):
+            candidates: np.ndarray = np.flatnonzero(accept)
+            card_masks: np.ndarray = (np.int64(1) << self.first[candidates].astype(np.int64)) \
+                | (np.int64(1) << self.second[candidates].astype(np.int64))
+            self._seat_tables.append((candidates, card_masks, *Simulator._alias_table(row[candidates])))
+
+    @staticmethod
+    def _alias_table(weights: np.ndarray) -> tuple[np.ndarray]:
+        # Builds Vose's alias table for drawing index i with probability
+        # proportional to weights[i]: draw a column uniformly, then keep it
+        # with its probability or take its alias otherwise.
+        n: int = len(weights)
+        probabilities: np.ndarray = np.ones(n)
+        aliases: np.ndarray = np.arange(n)
+        if n == 0:
+            return probabilities, aliases
+        scaled: np.ndarray = weights * n / weights.sum()
+        small: list[int] = [i for i in range(n) if scaled[i] < 1]
+        large: list[int] = [i for i in range(n) if scaled[i] >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probabilities[less] = scaled[less]
+            aliases[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+        # Whatever is left over is 1 up to rounding error
+        return probabilities, aliases
+
+    def categorize(self, values: np.ndarray, levels: np.ndarray) -> np.ndarray:
+        """Converts the strengths of the best opponent hand in each sample to
+            an outcome category.
+
+        The category of a hand of level L is 3*L+1, unless L is the player's
+            level, in which case it is 3*L, 3*L+1 or 3*L+2 for hands that
+            lose to, draw with and beat the player's hand respectively. This
+            matches the Level index of Table.probabilities' DataFrames, where
+            the player's level is split into L-0.25, L and L+0.25.
+
+        Positional arguments:
+        values (np.ndarray): The best opponent hand's value in each sample.
+        levels (np.ndarray): The best opponent hand's level in each sample.
+
+        Returns: An int array of categories between 0 and 26.
+        """
+        player_level: int = self.player_strength["level"]
+        categories: np.ndarray = 3*levels.astype(np.int64) + 1
+        same: np.ndarray = levels == player_level
+        categories[same] += np.sign(values[same] - self.player_strength["value"])
+        return categories
+
+    def _seat(self, seat: int) -> int:
+        # The row of weights used by a seat, counting from 0
+        return min(seat, len(self.weights) - 1)
+
+    def _check_seats(self, opponents: int) -> None:
+        if 2*opponents > self.deck_size:
+            raise ValueError(f"Cannot deal {opponents} opponents from a Deck of length {self.deck_size}.")
+        for seat in range(opponents):
+            if not len(self._seat_tables[self._seat(seat)][0]):
+                raise ValueError(f"No holding left in the deck is in the range of opponent {seat + 1}.")
+
+    def _draw(self, opponents: int, n_rows: int, rng: np.random.Generator,
+              used: np.ndarray = None, stats: Stats = None) -> np.ndarray:
+        # Deals n_rows sets of disjoint opponent holdings, one seat at a
+        # time, and returns their holding indices as an (n_rows, opponents)
+        # array. used optionally gives, for each row, a bitmask of deck 
+        # positions already dealt, which the holdings must avoid.
+        holdings: np.ndarray = np.empty((n_rows, opponents), dtype=np.int64)
+        used = np.zeros(n_rows, dtype=np.int64) if used is None else used.copy()
+        for seat in range(opponents):
+            candidates, card_masks, alias_probabilities, aliases = self._seat_tables[self._seat(seat)]
+            chosen: np.ndarray = np.empty(n_rows, dtype=np.int64)
+            # Alias table draws, redrawing the rows whose holding shares a
+            # card with an earlier seat
+            pending: np.ndarray = np.arange(n_rows)
+            for _ in range(self.alias_rounds):
+                columns: np.ndarray = rng.integers(len(candidates), size=len(pending))
+                keep: np.ndarray = rng.random(len(pending)) < alias_probabilities[columns]
+                picks: np.ndarray = np.where(keep, columns, aliases[columns])
+                clash: np.ndarray = (card_masks[picks] & used[pending]) != 0
+                chosen[pending[~clash]] = picks[~clash]
+                pending = pending[clash]
+                if stats is not None:
+                    stats.count("rejected_draws", len(pending))
+                if not len(pending):
+                    break
+            # Rows still clashing, e.g. when few holdings remain free, draw
+            # directly from the weights of the free holdings.
+            for start in range(0, len(pending), 4096):
+                rows: np.ndarray = pending[start:start + 4096]
+                free: np.ndarray = (card_masks[None, :] & used[rows, None]) == 0
+                cumulative: np.ndarray = np.cumsum(free * self.weights[self._seat(seat), candidates], axis=1)
+                if (cumulative[:, -1] <= 0).any():
+                    raise ValueError(f"Cannot deal {opponents} opponents disjoint holdings in their ranges.")
+                targets: np.ndarray = rng.random(len(rows)) * cumulative[:, -1]
+                chosen[rows] = (cumulative <= targets[:, None]).sum(axis=1)
+            holdings[:, seat] = candidates[chosen]
+            used |= card_masks[chosen]
+        return holdings
+
+    def _best_categories(self, holdings: np.ndarray) -> np.ndarray:
+        # Finds the best hand in each row of holdings and returns its
+        # outcome category.
+        best: np.ndarray = self.values[holdings].argmax(axis=1)
+        best_holdings: np.ndarray = np.take_along_axis(holdings, best[:, None], axis=1)[:, 0]
+        return self.categorize(self.values[best_holdings], self.levels[best_holdings])
+
+    def sample_counts(self, opponents: int, n_samples: int, rng: np.random.Generator,
+                      stats: Stats = None) -> np.ndarray:
+        """Deals random sets of opponent holdings and counts the outcome 
+            category of the best hand in each set.
+
+        Positional arguments:
+        opponents (int): The number of opponents, each dealt one holding.
+        n_samples (int): The number of sets to count.
+        rng (np.random.Generator): The source of randomness.
+
+        Optional arguments:
+        stats (Stats): Counts the samples and rejected draws. Defaults to 
+            None.
+
+        Returns: An int array of length n_categories with the number of
+            samples in each category, as per categorize().
+        """
+        self._check_seats(opponents)
+        if stats is not None:
+            stats.count("samples", n_samples)
+        counts: np.ndarray = np.zeros(self.n_categories, dtype=np.int64)
+        for start in range(0, n_samples, self.max_batch):
+            holdings: np.ndarray = self._draw(opponents, min(self.max_batch, n_samples - start), rng, stats=stats)
+            counts += np.bincount(self._best_categories(holdings), minlength=self.n_categories)
+        return counts
+
+    def shared_counts(self, opponents: list[int], n_samples: int, rng: np.random.Generator,
+                      stats: Stats = None) -> np.ndarray:
+        """Counts outcome categories for several numbers of opponents from a
+            single set of samples.
+
+        Each sample deals holdings to max(opponents) seats. Since seats are
+            dealt in order, the first k seats of a sample are dealt exactly
+            as in sample_counts(k), so the count for k opponents uses the 
+            best hand among the first k seats of every sample. All counts 
+            come from the same draws, so they do not differ by independent 
+            noise.
+
+        Positional arguments:
+        opponents (list[int]): The numbers of opponents to count.
+        n_samples (int): The number of samples to count.
+        rng (np.random.Generator): The source of randomness.
+
+        Optional arguments:
+        stats (Stats): As per sample_counts.
+
+        Returns: An int array of shape (len(opponents), n_categories), with
+            the counts for each entry of opponents, as per sample_counts.
+        """
+        seats: int = max(opponents)
+        self._check_seats(seats)
+        if stats is not None:
+            stats.count("samples", n_samples)
+        counts: np.ndarray = np.zeros((len(opponents), self.n_categories), dtype=np.int64)
+        for start in range(0, n_samples, self.max_batch):
+            holdings: np.ndarray = self._draw(seats, min(self.max_batch, n_samples - start), rng, stats=stats)
+            for i, k in enumerate(opponents):
+                counts[i] += np.bincount(self._best_categories(holdings[:, :k]), minlength=self.n_categories)
+        return counts
+
+    def parallel_counts(self, opponents: int, n_samples: int, workers: int,
+                        seed: np.random.SeedSequence, pool: ProcessPoolExecutor = None) -> np.ndarray:
+        """Splits sample_counts, or shared_counts if opponents is a list, 
+            across a pool of worker processes.
+
+        The Simulator is sent to each worker once, when the pool starts. 
+            Worker i draws its share of the samples from the i-th child of 
+            seed, so for a given seed and number of workers the result is 
+            the same on every run.
+
+        Positional arguments:
+        opponents (int | list[int]): The number of opponents, each dealt 
+            one holding, or a list of them for shared_counts.
+        n_samples (int): The total number of sets to count.
+        workers (int): The number of worker processes.
+        seed (np.random.SeedSequence): The root of the workers' random 
+            streams. Children are spawned from it on each call.
+
+        Optional arguments:
+        pool (ProcessPoolExecutor): A pool started by start_pool, reused 
+            across calls. Defaults to None, which starts and stops a pool 
+            for this call.
+
+        Returns: As per sample_counts or shared_counts.
+        """
+        if pool is None:
+            with self.start_pool(workers) as pool:
+                return self.parallel_counts(opponents, n_samples, workers, seed, pool)
+        shares: list[int] = [n_samples//workers + (i < n_samples % workers) for i in range(workers)]
+        streams: list[np.random.SeedSequence] = seed.spawn(workers)
+        results = pool.map(_worker_counts, [opponents]*workers, shares, streams)
+        return sum(results)
+
+    def start_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Starts a pool of worker processes that each hold a copy of this 
+            Simulator, for use with parallel_counts.
+        """
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,))
+
+    def adaptive_counts(self, opponents: int, precision: float, max_samples: int,
+                        seed: np.random.SeedSequence, workers: int = None, stats: Stats = None) -> tuple:
+        """Samples in batches until every category's 95% confidence 
+            interval is at most precision percentage points wide on each side,
+            or until max_samples samples have been drawn.
+
+        Positional arguments:
+        opponents (int): The number of opponents, each dealt one holding.
+        precision (float): The target half-width, in percentage points.
+        max_samples (int): The most samples to draw.
+        seed (np.random.SeedSequence): The source of randomness.
+
+        Optional arguments:
+        workers (int): The number of worker processes to split each batch 
+            across. Defaults to None, which samples in this process.
+        stats (Stats): As per sample_counts. Only the samples are counted
+            when workers are used.
+
+        Returns: A tuple of the counts, as per sample_counts, and the number 
+            of samples drawn.
+        """
+        parallel: bool = workers is not None and workers > 1
+        pool: ProcessPoolExecutor = self.start_pool(workers) if parallel else None
+        rng: np.random.Generator = None if parallel else np.random.default_rng(seed)
+        counts: np.ndarray = np.zeros(self.n_categories, dtype=np.int64)
+        total: int = 0
+        try:
+            while total < max_samples:
+                n_samples: int = min(self.adaptive_batch * (workers if parallel else 1), max_samples - total)
+                if parallel:
+                    counts += self.parallel_counts(opponents, n_samples, workers, seed, pool)
+                    if stats is not None:
+                        stats.count("samples", n_samples)
+                else:
+                    counts += self.sample_counts(opponents, n_samples, rng, stats)
+                total += n_samples
+                if self.half_widths(counts, total).max() * 100 <= precision:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return counts, total
+
+    @staticmethod
+    def half_widths(counts: np.ndarray, total: int, z: float = 1.96) -> np.ndarray:
+        """Computes the half-width of the Wilson score interval of each 
+            category's proportion, which stays meaningful for proportions 
+            near 0 or 1.
+
+        Positional arguments:
+        counts (np.ndarray): The number of samples in each category.
+        total (int): The number of samples.
+
+        Optional arguments:
+        z (float): The normal quantile of the confidence level. Defaults to 
+            1.96, for 95% intervals.
+
+        Returns: A float array of half-widths, as proportions.
+        """
+        p: np.ndarray = counts / total
+        return z / (1 + z**2/total) * np.sqrt(p*(1 - p)/total + z**2/(4*total**2))
+
+    def n_assignments(self, opponents: int) -> int:
+        """Returns an upper bound on the number of ordered ways to deal each
+            opponent a holding with positive weight, ignoring that holdings 
+            must not share cards.
+        """
+        return int(np.prod([len(self._seat_tables[self._seat(seat)][0]) for seat in range(opponents)]))
+
+    def exact_counts(self, opponents: int) -> tuple:
+        """Computes the exact distribution of the outcome category of the 
+            best hand, when the opponents are dealt as in sample_counts.
+
+        Supports up to two opponents. For two, the probability of dealing
+            holding h1 to the first and then h2 to the second is 
+            w1(h1) * w2(h2) / F(h1), where w1 and w2 are the seats' weights,
+            each normalized to sum to 1, and F(h1) is the second seat's 
+            weight of the holdings sharing no card with h1: 1 minus its 
+            weight of the holdings containing either of h1's cards, plus 
+            w2(h1) since h1 contains both.
+
+        Positional arguments:
+        opponents (int): The number of opponents, 1 or 2.
+
+        Returns: A tuple of a float array of length n_categories with the 
+            probability of each category, as per categorize(), and 1, the 
+            total probability.
+        """
+        if opponents not in (1, 2):
+            raise ValueError(f"Exact enumeration supports 1 or 2 opponents, not {opponents}")
+        self._check_seats(opponents)
+        first_weights: np.ndarray = self.weights[0] / self.weights[0].sum()
+        categories: np.ndarray = self.categorize(self.values, self.levels)
+        if opponents == 1:
+            return np.bincount(categories, weights=first_weights, minlength=self.n_categories), 1
+
+        second_weights: np.ndarray = self.weights[self._seat(1)] / self.weights[self._seat(1)].sum()
+        card_weights: np.ndarray = np.bincount(self.first, second_weights, minlength=self.deck_size) \
+            + np.bincount(self.second, second_weights, minlength=self.deck_size)
+        # Holdings dealt to the first and second seat
+        rows: np.ndarray = self._seat_tables[0][0]
+        columns: np.ndarray = self._seat_tables[self._seat(1)][0]
+        free_weights: np.ndarray = 1 - card_weights[self.first[rows]] - card_weights[self.second[rows]] \
+            + second_weights[rows]
+        if (free_weights <= 1e-12).any():
+            raise ValueError(f"Cannot deal {opponents} opponents disjoint holdings in their ranges.")
+        first1, second1 = self.first[rows][:, None], self.second[rows][:, None]
+        first2, second2 = self.first[columns][None, :], self.second[columns][None, :]
+        disjoint: np.ndarray = (first1 != first2) & (first1 != second2) & (second1 != first2) & (second1 != second2)
+        probabilities: np.ndarray = (first_weights[rows] / free_weights)[:, None] \
+            * second_weights[columns][None, :] * disjoint
+        values1, values2 = self.values[rows][:, None], self.values[columns][None, :]
+        best: np.ndarray = np.where(values1 >= values2, categories[rows][:, None], categories[columns][None, :])
+        return np.bincount(best.ravel(), weights=probabilities.ravel(), minlength=self.n_categories), 1
+
+
+# The Simulator of the current worker process, as set by parallel_counts
+_worker_simulator: Simulator = None
+
+def _init_worker(simulator: Simulator) -> None:
+    global _worker_simulator
+    _worker_simulator = simulator
+
+def _worker_counts(opponents, n_samples: int, seed: np.random.SeedSequence) -> np.ndarray:
+    # A list of opponents is answered with shared_counts
+    if isinstance(opponents, list):
+        return _worker_simulator.shared_counts(opponents, n_samples, np.random.default_rng(seed))
+    return _worker_simulator.sample_counts(opponents, n_samples, np.random.default_rng(seed))
@@ -0,0 +1,88 @@
+import contextlib
+import time
+
+class Stats:
+    def __init__(self):
+        """Opt-in timings and counters for Table.probabilities and the
+            methods built on it.
+
+        Pass a Stats object as the stats argument to collect them; it
+            accumulates over every call it is passed to. Without one, the
+            methods only check that stats is None, so there is next to no
+            cost.
+
+        Phases, in seconds of wall time:
+        cache: Computing the canonical key, looking it up and storing
+            results.
+        preflop_table: Looking up the PreflopTable.
+        strengths: Rating the opponent holdings and building the Simulator.
+        exact: Computing exact distributions.
+        sampling: Dealing and rating samples.
+        dataframes: Assembling the DataFrames.
+        display: Printing, in display and analyze_and_display.
+
+        Counters:
+        calls: The number of calls the object was passed to.
+        hands_evaluated: The number of hands rated, the player's included.
+        samples: The number of samples dealt.
+        rejected_draws: The number of holdings drawn for a seat and redrawn
+            because they shared a card with an earlier seat. Not counted
+            when sampling across worker processes.
+        cache_hits, cache_misses: Lookups in Table.result_cache and
+            Table.persistent_cache together.
+        persistent_hits: Cache hits answered from Table.persistent_cache.
+        preflop_hits: Results answered from the PreflopTable.
+
+        Instance variables:
+        phases (dict[str, float]): The time spent in each phase so far.
+        counters (dict[str, int]): The value of each counter so far.
+
+        Methods:
+        phase: Times a block of code as a phase.
+        count: Adds to a counter.
+        as_dict: Returns the phases and counters as one dictionary.
+        reset: Clears the phases and counters.
+        """
+        self.phases: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Adds the wall time of the block it wraps to the named phase."""
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Adds amount to the named counter."""
+        self.counters[name] = self.counters.get(name, 0) + int(amount)
+
+    def as_dict(self) -> dict:
+        """Returns a dictionary with the phases ("phases"), the counters
+            ("counters"), and the number of rejected draws per sample
+            ("rejected_draws_per_sample"), suitable for a metrics pipeline.
+        """
+        samples: int = self.counters.get("samples", 0)
+        return {
+            "phases": dict(self.phases),
+            "counters": dict(self.counters),
+            "rejected_draws_per_sample": self.counters.get("rejected_draws", 0) / samples if samples else 0.0,
+        }
+
+    def reset(self) -> None:
+        """Clears every phase and counter."""
+        self.phases.clear()
+        self.counters.clear()
+
+    @staticmethod
+    def phase_of(stats, name: str):
+        """Returns stats.phase(name), or a context manager that does
+            nothing if stats is None.
+        """
+        return _no_phase if stats is None else stats.phase(name)
+
+
+# Shared by every untimed phase; nullcontext holds no state
+_no_phase = contextlib.nullcontext()
@@ -0,0 +1,66 @@
+from Card import Card
+import itertools
+
+class SuitIsomorphism:
+    """Maps table states that are equal up to a relabeling of suits to one
+    canonical key.
+
+    Probabilities depend only on which cards the player holds and which are
+    on the board, not on what the suits are called: A♠K♠ on Q♠J♥2♦ gives the
+    same results as A♥K♥ on Q♥J♣2♦. canonical_key tries all 24 permutations
+    of the suits and keeps the smallest resulting (player, community) pair
+    of sorted card-id tuples, so both of those states get the same key.
+
+    Class variables:
+    permutations (list[list[int]]): For each of the 24 suit permutations, a
+        list mapping each card id to the id of its relabeled card.
+
+    Static methods:
+    canonical_key: Computes the canonical key of a table state.
+    canonical_permutation: Finds the relabeling giving the canonical key.
+    """
+
+    permutations: list[list[int]] = [
+        [card_id - card_id % 4 + permutation[card_id % 4] for card_id in range(52)]
+        for permutation in itertools.permutations(range(4))
+    ]
+
+    @staticmethod
+    def canonical_key(player: list[Card], community: list[Card]) -> tuple:
+        """Computes a key shared by every suit relabeling of a table state.
+
+        Positional arguments:
+        player (list[Card]): The player's cards.
+        community (list[Card]): The community cards.
+
+        Returns: A tuple of two tuples of card ids, the relabeled player
+            cards and community cards, each in ascending order.
+        """
+        return SuitIsomorphism._canonical(player, community)[0]
+
+    @staticmethod
+    def canonical_permutation(player: list[Card], community: list[Card]) -> list[int]:
+        """Finds a suit relabeling that takes a table state to its canonical
+            key. Every relabeling that does so gives the same cards, so 
+            computing on the relabeled state gives the same result for every
+            equivalent state.
+
+        Positional arguments: As per canonical_key.
+
+        Returns: One of SuitIsomorphism.permutations.
+        """
+        return SuitIsomorphism._canonical(player, community)[1]
+
+    @staticmethod
+    def _canonical(player: list[Card], community: list[Card]) -> tuple:
+        # Returns the canonical key and the first permutation giving it
+        player_ids: list[int] = [card.id for card in player]
+        community_ids: list[int] = [card.id for card in community]
+        best: tuple = None
+        best_permutation: list[int] = None
+        for permutation in SuitIsomorphism.permutations:
+            key: tuple = (tuple(sorted([permutation[card_id] for card_id in player_ids])),
+                          tuple(sorted([permutation[card_id] for card_id in community_ids])))
+            if best is None or key < best:
+                best, best_permutation = key, permutation
+        return best, best_permutation
@@ -1,9 +1,19 @@
 from Card import Card
-from PokerHand import PokerHand
+from CompactHand import CompactHand
+from PersistentCache import PersistentCache
 from Deck import Deck
-import itertools
+from EquitySimulator import EquitySimulator
+from HandRange import HandRange
+from Holdings import Holdings
+from PreflopTable import PreflopTable
+from ResultCache import ResultCache
+from Stats import Stats
+from Simulator import Simulator
+from SuitIsomorphism import SuitIsomorphism
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import numpy as np
 import pandas as pd
-import random
 from tabulate import tabulate
 
 # human_readable returns [(pair, two_pair, ...), (card ranks)]
@@ -21,6 +31,20 @@ class Table:
         7: "Four of a Kind",
         8: "Straight Flush",
     }
+    # probabilities() switches to exact enumeration automatically when there
+    # are at most this many ways to deal the opponents' holdings.
+    exact_limit: int = 2_000_000
+    # Results of probabilities(), shared by all tables and keyed by the 
+    # suit-canonical table state. Use result_cache.resize() to change its 
+    # size limit.
+    result_cache: ResultCache = ResultCache(maxsize=1024)
+    # An optional on-disk cache consulted after result_cache and shared 
+    # across processes and sessions, such as 
+    # PersistentCache("results.sqlite"). None disables it.
+    persistent_cache: PersistentCache = None
+    # Part of every persistent_cache key. Bump it when a change to the 
+    # simulation makes stored results stale.
+    cache_version: int = 2
 
     def __init__(self):
         """Defines a class that simulates & analyzes games of Texas
@@ -40,6 +64,9 @@ class Table:
             community cards.
         deck (Deck): A Deck object representing the cards in the gmae that 
             are neither part of the player's hand nor the community cards.
+        holdings (Holdings): The evaluator state of every opponent holding 
+            that can be made from the deck, updated as community cards are 
+            added.
         n (int): The number of random samples used for estimation. Defaults to
             10,000.
 
@@ -48,12 +75,23 @@ class Table:
         add_community: Adds cards to the instance's community cards.
         estimate: Uses random sampling to estimate the probability of at 
             least one player at the table beating the player's hand.
+        shared_probabilities: As per probabilities, for several numbers of
+            opponents from one set of samples.
+        outcome_probabilities: As per shared_probabilities, as numbers.
+        equity: Estimates the player's chances at showdown, dealing the 
+            rest of the board.
+        copy: Returns an independent copy of the table.
+        next_cards: Analyzes every possible next community card.
+        analyze: Builds the tables shown by analyze_and_display.
+        display: Prints the cards and the tables built by analyze.
         """
 
         self.deck: Deck = Deck()
         self.deck.shuffle()
         self.player: list[Card] = list(self.deck.draw(2))
         self.community_cards: list[Card] = []
+        self.holdings: Holdings = Holdings(self.deck, self.community_cards)
+        self._simulators: dict[tuple, Simulator] = {}
 
     def new_game(self):
         '''Re-initizalizes the table. Uses an alternative name for user 
@@ -86,6 +124,8 @@ class Table:
         self.deck.remove(card1)
         self.deck.remove(card2)
         self.community_cards: list[Card] = []
+        self.holdings: Holdings = Holdings(self.deck, self.community_cards)
+        self._simulators: dict[tuple, Simulator] = {}
 
         
     def add_community(self, *new_cards: Card) -> None:
@@ -109,11 +149,31 @@ class Table:
                                  community_cards.")
         if len(set(new_cards)) != len(new_cards):
             raise ValueError("All arguments must be unique.")
+        if len(self.community_cards) + len(new_cards) > 5:
+            raise ValueError(f"A table has at most 5 community cards, not {len(self.community_cards) + len(new_cards)}")
 
         self.community_cards.extend(new_cards)
         for card in new_cards:
             self.deck.remove(card)
+            self.holdings.add_card(card)
+        self._simulators = {}
     
+    def copy(self):
+        """Returns a Table in the same state, whose cards can be dealt 
+            independently of this one. Its deck is a copy, as per 
+            Deck.copy, in the same order, so both tables deal the same 
+            cards.
+        """
+        table: Table = Table.__new__(Table)
+        table.player = list(self.player)
+        table.community_cards = list(self.community_cards)
+        table.deck = self.deck.copy()
+        # add_card replaces the arrays of Holdings rather than writing to 
+        # them, so the copies can share them.
+        table.holdings = copy.copy(self.holdings)
+        table._simulators = dict(self._simulators)
+        return table
+
     def draw_community(self, num_cards: int):
         """Draws cards from the deck and adds them to the community cards. 
             Drawn cards are removed from the deck.
@@ -123,19 +183,70 @@ class Table:
 
         Returns: None
         """
+        if len(self.community_cards) + num_cards > 5:
+            raise ValueError(f"A table has at most 5 community cards, not {len(self.community_cards) + num_cards}")
 
         cards_to_add: tuple[Card] = self.deck.draw(num_cards)
         self.community_cards.extend(cards_to_add)
+        for card in cards_to_add:
+            self.holdings.add_card(card)
+        self._simulators = {}
     
 
 
-    def probabilities(self, opponents, n_samples:int=10000) -> pd.DataFrame:
+    def probabilities(self, opponents, n_samples:int=10000, exact: bool = None,
+                      seed: int = None, workers: int = None, precision: float = None,
+                      preflop_table: bool = True, cache: bool = True, ranges = None,
+                      stats: Stats = None) -> pd.DataFrame:
         """Estimates the probability that each type of the hand is the 
             strongest at the table, excluding the player's.
+
+        Each opponent in turn is dealt a holding in their range from the 
+            cards not yet dealt, as per Simulator.
         
         Positional arguments:
+        opponents (int): The number of opponents at the table.
         n_samples (int): The number of simulations to use in the estimate. 
             Defaults to 10000.
+
+        Optional arguments:
+        exact (bool): If True, computes the probability of every way to 
+            deal the opponents holdings in their ranges instead of sampling,
+            giving exact percentages; supported for 1 or 2 opponents. If 
+            False, always samples. Defaults to None, which counts exactly whenever that is
+            supported and there are at most Table.exact_limit ways to deal 
+            the holdings.
+        seed (int): Seeds the random sampling, so that repeated calls with
+            the same seed and workers give identical results. Defaults to 
+            None, which seeds from the operating system.
+        workers (int): The number of processes to split the sampling 
+            across. Each draws from its own substream of seed. Defaults to 
+            None, which samples in this process.
+        precision (float): If given, samples in batches until the 95% 
+            confidence interval of every percentage is at most this many 
+            percentage points wide on each side, with n_samples as the cap.
+            Defaults to None, which draws exactly n_samples samples.
+        preflop_table (bool): Whether to answer from the precomputed 
+            PreflopTable when no community cards have been dealt, in which
+            case the other optional arguments and n_samples are ignored. 
+            Defaults to True; falls back to computing the result when the 
+            table has no entry.
+        cache (bool): Whether to reuse a result from Table.result_cache, or
+            from Table.persistent_cache if one is set. Results are cached 
+            under the table state up to a relabeling of suits (see 
+            SuitIsomorphism) together with every other argument, so a hit 
+            returns the counts of an earlier, equivalent call. Those are 
+            the counts this call would compute, since every state is 
+            simulated in its canonical suits. Defaults to True.
+        ranges (str | list[str]): The opponents' ranges, in the notation of
+            HandRange, such as "QQ+, AKs, ATo+, 76s". A list gives the 
+            ranges of the first opponents in order, the last one also 
+            applying to any further opponents. Defaults to None, which gives
+            every opponent HandRange.default, the original reasonability 
+            check.
+        stats (Stats): Collects timings per phase and counters, such as the
+            number of hands evaluated and cache hits. Defaults to None, 
+            which collects nothing.
         
         Returns: List of three pandas DataFrames. Each contains two columns, 
             called "Level" and "Percentage" respectively. The Level 
@@ -148,81 +259,566 @@ class Table:
             the levels weaker than the player's. The second is further 
             subdivided into "Level (High)", "Level", and "Level (Weak)", 
             which represent hands that beat, draw, and lose to the player, 
-            respectively.
+            respectively. If precision is given, each DataFrame also has an 
+            "Interval" column with the half-width of each percentage's 95% 
+            confidence interval (for example "±0.41%") and a "Samples" 
+            column with the number of samples used.
         """
 
-        # Find the player's hand strength
-        player_full_hand: PokerHand = PokerHand(self.player + self.community_cards)
-        player_strength: dict = player_full_hand.best_hand()
-        player_level: int = player_strength["level"]
+        if stats is not None:
+            stats.count("calls")
+        ranges = Table._range_key(ranges)
+        result = None
+        if preflop_table and not self.community_cards and ranges == (HandRange.default,):
+            with Stats.phase_of(stats, "preflop_table"):
+                result = PreflopTable.lookup(self.player[0], self.player[1], opponents)
+            if result is not None and stats is not None:
+                stats.count("preflop_hits")
+
+        if result is None and cache:
+            with Stats.phase_of(stats, "cache"):
+                key: tuple = (SuitIsomorphism.canonical_key(self.player, self.community_cards),
+                              opponents, n_samples, exact, seed, workers, precision, ranges)
+            result = Table._cached(key, lambda: self._probability_counts(
+                opponents, n_samples, exact, seed, workers, precision, ranges, stats), stats)
+        elif result is None:
+            result = self._probability_counts(opponents, n_samples, exact, seed, workers, precision, ranges, stats)
+        with Stats.phase_of(stats, "dataframes"):
+            return Table._counts_to_dataframes(*result, intervals=precision is not None)
+
+    def _probability_counts(self, opponents: int, n_samples: int = 10000, exact: bool = None,
+                            seed: int = None, workers: int = None, precision: float = None,
+                            ranges = None, stats: Stats = None) -> tuple:
+        """Computes the outcome counts behind probabilities, without any 
+            lookup in precomputed tables.
+
+        Arguments: As per probabilities.
+
+        Returns: A tuple of the counts (an array, as per 
+            Simulator.categorize()), the number of samples or assignments 
+            counted, the player's level, and whether the counts are exact.
+        """
 
-        # Dictionary that will store the number of opponents with each hand level. Indexes are the numeric 
-        # representations of each level, as per PokerHand.best_hand()
-        hand_level_counts = {level: 0 for level in range(9)}
-        # These two represent "player's level but weaker" and "player's level 
-        # but stronger," respectively
-        hand_level_counts[player_level-0.25] = 0
-        hand_level_counts[player_level+0.25] = 0
+        simulator: Simulator = self._get_simulator(ranges, stats)
+        player_strength: dict = simulator.player_strength
+
+        if exact is None:
+            exact = opponents <= 2 and simulator.n_assignments(opponents) <= Table.exact_limit
+        if exact:
+            with Stats.phase_of(stats, "exact"):
+                counts, total = simulator.exact_counts(opponents)
+            return counts, total, player_strength["level"], True
 
-        # Stores the strength of every possible opponent hand in a dict. Doing this now saves a lot of computation time 
-        # later. Keys are the string representations of the two cards in each starting hand.
-        hand_strengths = {}
-        
-        for opponent_hand in itertools.combinations(self.deck, 2):
-            card1, card2 = opponent_hand
-            full_opponent_hand: PokerHand = PokerHand(self.community_cards + list(opponent_hand))
-            opponent_hand_strength = full_opponent_hand.best_hand()
-            hand_strengths[f"{str(card1)}{str(card2)}"] = opponent_hand_strength
-            hand_strengths[f"{str(card2)}{str(card1)}"] = opponent_hand_strength
-        
         # Random sampling
-        for sample in range(n_samples):
-            reasonable = False
-            while not reasonable:
-                reasonable = True
-                # This is the fastest way I can think of to set up all the the 
-                # hands.
-                chosen_cards = random.sample(self.deck.cards, opponents*2)
-                opponents_hands = [(chosen_cards[2*n], chosen_cards[2*n+1]) for n in range(opponents)]
-                for hand in opponents_hands:
-                    """
-                    Reasonability check. Keep if:
-                    - At least 1 King/Ace
-                    - Both > 10
-                    - Consecutive cards
-                    - Suited
-                    - Pair
-                    Otherwise draw a new set
-                    """
-                    card1, card2 = hand
-                    if ((int(card1.value, 16) < 13) and (int(card2.value, 16) < 13)) and \
-                            ((int(card1.value, 16)) < 10 or (int(card2.value, 16) < 10)) and \
-                            ((abs(int(card1.value, 16)-int(card2.value, 16))) > 1) and \
-                                (card1.suit != card2.suit):
-                        reasonable = False
-                        break
-
-            opponents_hands = [str(hand[0]) + str(hand[1]) for hand in opponents_hands]
-            opponents_strengths = [hand_strengths[hand] for hand in opponents_hands]
-            
-            # Finds the best hand. Can't use max() because that wouldn't store the level.
-            best_hand = {"level": 0, "value": 0}
-            for strength in opponents_strengths:
-                if strength["value"] > best_hand["value"]:
-                    best_hand = strength
-            # Increments the correct value in the levels dictionary
-            if best_hand["level"] != player_level:
-                hand_level_counts[best_hand["level"]] += 1
+        seed_sequence: np.random.SeedSequence = np.random.SeedSequence(seed)
+        with Stats.phase_of(stats, "sampling"):
+            if precision is not None:
+                counts, n_samples = simulator.adaptive_counts(opponents, precision, n_samples, seed_sequence,
+                                                              workers, stats)
+            elif workers is not None and workers > 1:
+                counts: np.ndarray = simulator.parallel_counts(opponents, n_samples, workers, seed_sequence)
+                if stats is not None:
+                    stats.count("samples", n_samples)
             else:
-                if best_hand["value"] > player_strength["value"]:
-                    hand_level_counts[best_hand["level"]+0.25] += 1
-                elif best_hand["value"] == player_strength["value"]:
-                    hand_level_counts[best_hand["level"]] += 1
+                counts: np.ndarray = simulator.sample_counts(opponents, n_samples,
+                                                             np.random.default_rng(seed_sequence), stats)
+        return counts, n_samples, player_strength["level"], False
+
+    def shared_probabilities(self, opponents: list[int], n_samples: int = 10000, exact: bool = None,
+                             seed: int = None, workers: int = None, preflop_table: bool = True,
+                             cache: bool = True, ranges = None, stats: Stats = None) -> dict[int, list[pd.DataFrame]]:
+        """As per probabilities, for several numbers of opponents at once.
+
+        Every number of opponents that is sampled rather than counted 
+            exactly or looked up in the PreflopTable is answered from one 
+            set of n_samples samples (see Simulator.shared_counts), instead
+            of one independent run each. The columns of analyze_and_display
+            therefore share their random draws.
+
+        Positional arguments:
+        opponents (list[int]): The numbers of opponents at the table.
+
+        Optional arguments:
+        n_samples, exact, seed, workers, preflop_table, cache, ranges, 
+            stats: As per probabilities.
+
+        Returns: A dictionary mapping each entry of opponents to its result,
+            as per probabilities.
+        """
+        opponents = sorted(set(opponents)) if isinstance(opponents, list) else opponents
+        results: dict = self._shared_results(opponents, n_samples, exact, seed, workers, preflop_table, cache,
+                                             ranges, stats)
+        with Stats.phase_of(stats, "dataframes"):
+            return {n: Table._counts_to_dataframes(*results[n]) for n in opponents}
+
+    def outcome_probabilities(self, opponents: list[int], n_samples: int = 10000, exact: bool = None,
+                              seed: int = None, workers: int = None, preflop_table: bool = True,
+                              cache: bool = True, ranges = None, stats: Stats = None) -> dict[int, dict]:
+        """As per shared_probabilities, as plain numbers rather than 
+            DataFrames, for callers that process the results further.
+
+        Arguments: As per shared_probabilities.
+
+        Returns: A dictionary mapping each entry of opponents to a 
+            dictionary with the probabilities that the player's hand beats 
+            ("win"), ties ("tie") and loses to ("loss") the best opponent 
+            hand, the probability that the best opponent hand has each 
+            level ("levels", an array of nine, High Card first), the level 
+            of the player's hand ("player_level"), whether the result is 
+            exact ("exact"), and the number of samples ("samples", 1 if 
+            exact).
+        """
+        opponents = sorted(set(opponents)) if isinstance(opponents, list) else opponents
+        results: dict = self._shared_results(opponents, n_samples, exact, seed, workers, preflop_table, cache,
+                                             ranges, stats)
+        return {n: Table._outcomes(*results[n]) for n in opponents}
+
+    def _shared_results(self, opponents: list[int], n_samples: int = 10000, exact: bool = None,
+                        seed: int = None, workers: int = None, preflop_table: bool = True,
+                        cache: bool = True, ranges = None, stats: Stats = None) -> dict[int, tuple]:
+        """Looks up or computes the counts behind shared_probabilities.
+
+        Arguments: As per shared_probabilities.
+
+        Returns: A dictionary mapping each entry of opponents to its counts,
+            as per _probability_counts.
+        """
+        if not isinstance(opponents, list):
+            raise TypeError(f"Positional argument opponents must be of type list, not {type(opponents)}")
+        opponents = sorted(set(opponents))
+        ranges = Table._range_key(ranges)
+        if stats is not None:
+            stats.count("calls")
+
+        results: dict = {}
+        if preflop_table and not self.community_cards and ranges == (HandRange.default,):
+            with Stats.phase_of(stats, "preflop_table"):
+                for n in opponents:
+                    result = PreflopTable.lookup(self.player[0], self.player[1], n)
+                    if result is not None:
+                        results[n] = result
+            if stats is not None:
+                stats.count("preflop_hits", len(results))
+        missing: list[int] = [n for n in opponents if n not in results]
+
+        if missing and cache:
+            with Stats.phase_of(stats, "cache"):
+                key: tuple = (SuitIsomorphism.canonical_key(self.player, self.community_cards),
+                              tuple(missing), n_samples, exact, seed, workers, ranges, "shared")
+            results.update(Table._cached(key, lambda: self._shared_probability_counts(
+                missing, n_samples, exact, seed, workers, ranges, stats), stats))
+        elif missing:
+            results.update(self._shared_probability_counts(missing, n_samples, exact, seed, workers, ranges, stats))
+        return results
+
+    def _shared_probability_counts(self, opponents: list[int], n_samples: int = 10000, exact: bool = None,
+                                   seed: int = None, workers: int = None, ranges = None,
+                                   stats: Stats = None) -> dict[int, tuple]:
+        """Computes the outcome counts behind shared_probabilities, without
+            any lookup in precomputed tables.
+
+        Arguments: As per shared_probabilities.
+
+        Returns: A dictionary mapping each entry of opponents to its counts,
+            as per _probability_counts.
+        """
+        simulator: Simulator = self._get_simulator(ranges, stats)
+        player_level: int = simulator.player_strength["level"]
+
+        results: dict = {}
+        sampled: list[int] = []
+        for n in opponents:
+            exact_n: bool = exact
+            if exact_n is None:
+                exact_n = n <= 2 and simulator.n_assignments(n) <= Table.exact_limit
+            if exact_n:
+                with Stats.phase_of(stats, "exact"):
+                    counts, total = simulator.exact_counts(n)
+                results[n] = (counts, total, player_level, True)
+            else:
+                sampled.append(n)
+
+        if sampled:
+            seed_sequence: np.random.SeedSequence = np.random.SeedSequence(seed)
+            with Stats.phase_of(stats, "sampling"):
+                if workers is not None and workers > 1:
+                    counts = simulator.parallel_counts(sampled, n_samples, workers, seed_sequence)
+                    if stats is not None:
+                        stats.count("samples", n_samples)
                 else:
-                    hand_level_counts[best_hand["level"]-0.25] += 1
-        
+                    counts = simulator.shared_counts(sampled, n_samples, np.random.default_rng(seed_sequence), stats)
+            for n, counts_n in zip(sampled, counts):
+                results[n] = (counts_n, n_samples, player_level, False)
+        return results
+
+    def equity(self, opponents: int, n_samples: int = 10000, exact: bool = None, seed: int = None,
+               ranges = None, cache: bool = True) -> dict:
+        """Estimates the player's chances at showdown, dealing the rest of 
+            the board as well as the opponents' holdings.
+
+        Unlike probabilities, which compares hands on the community cards 
+            dealt so far, every sample deals the community cards still to 
+            come and compares the final 7-card hands.
+
+        Positional arguments:
+        opponents (int): The number of opponents at the table.
+
+        Optional arguments:
+        n_samples (int): The number of runouts to sample. Defaults to 10000.
+        exact (bool): If True, enumerates every runout and opponent holding
+            instead of sampling; supported for 1 opponent. If False, always
+            samples. Defaults to None, which enumerates whenever that is 
+            supported and there are at most Table.exact_limit runouts.
+        seed (int): Seeds the random sampling. Defaults to None, which 
+            seeds from the operating system.
+        ranges (str | list[str]): The opponents' ranges, as per 
+            probabilities.
+        cache (bool): Whether to reuse a result from Table.result_cache, as
+            per probabilities. Defaults to True.
+
+        Returns: A dictionary with the probabilities that the player wins 
+            ("win"), ties ("tie") and loses ("loss") against the best 
+            opponent hand, the player's expected share of the pot with ties
+            split evenly ("equity"), the number of samples ("samples", or 
+            "exact"), and a pandas DataFrame ("levels") with the probability
+            that the player's final hand ("Player") and the best opponent's 
+            final hand ("Opponents") have each "Level", strongest first.
+        """
+        if not isinstance(opponents, int):
+            raise TypeError(f"Positional argument opponents must be of type int, not {type(opponents)}")
+        if opponents < 1:
+            raise ValueError(f"Positional argument opponents must be at least 1, not {opponents}")
+        ranges = Table._range_key(ranges)
+
+        if cache:
+            key: tuple = (SuitIsomorphism.canonical_key(self.player, self.community_cards),
+                          opponents, n_samples, exact, seed, ranges, "equity")
+            result = Table._cached(key, lambda: self._equity_counts(opponents, n_samples, exact, seed, ranges))
+        else:
+            result = self._equity_counts(opponents, n_samples, exact, seed, ranges)
+        counts, total, exact = result
+
+        levels: pd.DataFrame = pd.DataFrame({
+            "Level": [Table.index_level_pairs[level] for level in range(8, -1, -1)],
+            "Player": counts["player_levels"][::-1] / total,
+            "Opponents": counts["opponent_levels"][::-1] / total,
+        })
+        loss, tie, win = counts["outcomes"] / total
+        return {"win": float(win), "tie": float(tie), "loss": float(loss), "equity": counts["share"] / total,
+                "samples": "exact" if exact else total, "levels": levels}
+
+    def _equity_counts(self, opponents: int, n_samples: int = 10000, exact: bool = None, seed: int = None,
+                       ranges = None) -> tuple:
+        """Computes the tallies behind equity.
+
+        Arguments: As per equity.
+
+        Returns: A tuple of the tallies, as per 
+            EquitySimulator.sample_counts, the number of samples (1 if 
+            exact), and whether they are exact.
+        """
+        # Relabeled like the Simulator's holdings, as per _holding_strengths
+        permutation: np.ndarray = self._canonical_permutation()
+        simulator: EquitySimulator = EquitySimulator(
+            self._get_simulator(ranges), np.sort(permutation[self.holdings.card_ids]),
+            permutation[[card.id for card in self.player]], permutation[[card.id for card in self.community_cards]])
+        if exact is None:
+            exact = opponents == 1 and simulator.n_assignments(opponents) <= Table.exact_limit
+        if exact:
+            return simulator.exact_counts(opponents), 1, True
+        rng: np.random.Generator = np.random.default_rng(np.random.SeedSequence(seed))
+        return simulator.sample_counts(opponents, n_samples, rng), n_samples, False
+
+    def next_cards(self, opponents, n_samples: int = 10000, seed: int = None, workers: int = None,
+                   ranges = None, stats: Stats = None):
+        """Analyzes every card that could come next, on the turn or the 
+            river, and how each changes the player's standing.
+
+        Each next card is analyzed as shared_probabilities would after 
+            add_community with that card, with the same opponents, 
+            n_samples, seed and ranges, and its result is stored in 
+            Table.result_cache (and Table.persistent_cache, if set). Once 
+            the card is dealt, that shared_probabilities call, and so 
+            analyze and analyze_and_display with the same opponents, is a 
+            cache lookup. So is probabilities for a single number of 
+            opponents, or for any number counted exactly, which compute the
+            same counts. Cards that give the same board up to a relabeling 
+            of suits (see SuitIsomorphism) are analyzed once.
+
+        Positional arguments:
+        opponents (int | list[int]): The number of opponents at the table,
+            or several numbers, as per shared_probabilities.
+
+        Optional arguments:
+        n_samples (int): The number of samples per card. Defaults to 10000.
+        seed (int): Seeds every card's sampling, as per probabilities. 
+            Defaults to None.
+        workers (int): The number of processes to split the cards across.
+            Defaults to None, which analyzes them in this process.
+        ranges (str | list[str]): The opponents' ranges, as per 
+            probabilities.
+        stats (Stats): As per probabilities.
+
+        Returns: For an int, a pandas DataFrame with one row per card left 
+            in the deck, best for the player first, with the columns:
+            Card: The card, such as "QH".
+            Level: The level of the player's hand with the card.
+            Win, Tie, Loss: The probabilities that the player's hand beats,
+                ties or loses to the best opponent hand with the card, as 
+                per probabilities.
+            Change: Win minus the probability of winning on the current 
+                board.
+            Out: Whether the card raises Win and lifts the player's hand 
+                level further above the level of the community cards alone.
+                A card that pairs the board raises both by one level, so it
+                is not an out: every opponent shares the improvement.
+            For a list, a dictionary mapping each entry to its DataFrame.
+        """
+        numbers: list = sorted(set(opponents)) if isinstance(opponents, list) else [opponents]
+        for n in numbers:
+            if not isinstance(n, int):
+                raise TypeError(f"Positional argument opponents must be of type int or list[int], not {type(n)}")
+            if n < 1:
+                raise ValueError(f"Positional argument opponents must be at least 1, not {n}")
+        if len(self.community_cards) not in (3, 4):
+            raise ValueError(f"The next card is the turn or the river, so the table must have 3 or 4 community "
+                             f"cards, not {len(self.community_cards)}")
+        ranges = Table._range_key(ranges)
+        if stats is not None:
+            stats.count("calls")
+
+        def shared_key(canonical: tuple) -> tuple:
+            # As in shared_probabilities, with its defaults for the other 
+            # arguments
+            return (canonical, tuple(numbers), n_samples, None, seed, None, ranges, "shared")
+
+        def single_key(canonical: tuple, n: int) -> tuple:
+            # As in probabilities, likewise
+            return (canonical, n, n_samples, None, seed, None, None, ranges)
+
+        current: dict = Table._cached(
+            shared_key(SuitIsomorphism.canonical_key(self.player, self.community_cards)),
+            lambda: self._shared_probability_counts(numbers, n_samples, seed=seed, ranges=ranges, stats=stats),
+            stats)
+
+        # Group the cards by the canonical key of the board they make
+        with Stats.phase_of(stats, "cache"):
+            branches: dict[tuple, list[Card]] = {}
+            for card_id in self.deck.card_ids():
+                card: Card = Card.from_id(card_id)
+                canonical: tuple = SuitIsomorphism.canonical_key(self.player, self.community_cards + [card])
+                branches.setdefault(canonical, []).append(card)
+        results: dict[tuple, dict] = {}
+        for canonical in branches:
+            result = Table._cache_get(shared_key(canonical), stats)
+            if result is None and len(numbers) == 1:
+                single = Table._cache_get(single_key(canonical, numbers[0]), stats)
+                result = None if single is None else {numbers[0]: single}
+            if result is not None:
+                results[canonical] = result
+        missing: list[tuple] = [canonical for canonical in branches if canonical not in results]
+
+        if missing:
+            if workers is not None and workers > 1:
+                player_ids: list[int] = [card.id for card in self.player]
+                boards: list[list[int]] = [[card.id for card in self.community_cards] + [branches[canonical][0].id]
+                                           for canonical in missing]
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    computed = list(pool.map(_branch_counts, [player_ids] * len(boards), boards,
+                                             [(numbers, n_samples, seed, ranges)] * len(boards)))
+            else:
+                computed = []
+                for canonical in missing:
+                    branch: Table = self.copy()
+                    branch.add_community(branches[canonical][0])
+                    computed.append(branch._shared_probability_counts(numbers, n_samples, seed=seed, ranges=ranges,
+                                                                      stats=stats))
+            for canonical, result in zip(missing, computed):
+                Table._cache_put(shared_key(canonical), result, stats)
+                for n in numbers:
+                    # Alone, or exact, n's counts are those probabilities 
+                    # would compute.
+                    if len(numbers) == 1 or result[n][3]:
+                        Table._cache_put(single_key(canonical, n), result[n], stats)
+                results[canonical] = result
+
+        with Stats.phase_of(stats, "dataframes"):
+            # How far the player's level is above the board's own level
+            board: CompactHand = CompactHand(self.community_cards)
+            current_margin: int = current[numbers[0]][2] - board.best_hand()["level"]
+            breakdowns: dict[int, pd.DataFrame] = {}
+            for n in numbers:
+                current_win: float = Table._outcomes(*current[n])["win"]
+                rows: list[dict] = []
+                for canonical, cards in branches.items():
+                    outcome: dict = Table._outcomes(*results[canonical][n])
+                    level, win = outcome["player_level"], outcome["win"]
+                    for card in cards:
+                        margin: int = level - board.with_card(card).best_hand()["level"]
+                        rows.append({"Card": str(card), "Level": Table.index_level_pairs[level], "Win": win,
+                                     "Tie": outcome["tie"], "Loss": outcome["loss"], "Change": win - current_win,
+                                     "Out": bool(margin > current_margin and win > current_win), "id": card.id})
+                breakdown: pd.DataFrame = pd.DataFrame(rows)
+                breakdown.sort_values(by=["Win", "id"], ascending=[False, True], inplace=True, ignore_index=True)
+                breakdowns[n] = breakdown.drop(columns="id")
+            return breakdowns if isinstance(opponents, list) else breakdowns[opponents]
+
+    @staticmethod
+    def _outcomes(counts: np.ndarray, total: int, player_level: int, exact: bool = False) -> dict:
+        """Converts counts, as per _probability_counts, to the dictionary 
+            returned by outcome_probabilities.
+        """
+        shares: np.ndarray = np.asarray(counts, dtype=np.float64) / total
+        return {
+            # Categories below the player's are wins, as per Simulator.categorize
+            "win": float(shares[:3*player_level+1].sum()),
+            "tie": float(shares[3*player_level+1]),
+            "loss": float(shares[3*player_level+2:].sum()),
+            "levels": shares.reshape(-1, 3).sum(axis=1),
+            "player_level": int(player_level),
+            "exact": bool(exact),
+            "samples": total,
+        }
+
+    @staticmethod
+    def _cached(key: tuple, compute, stats: Stats = None):
+        """Returns the result stored under key in Table.result_cache, or 
+            else in Table.persistent_cache if one is set. Otherwise computes
+            it by calling compute() and stores it in both.
+        """
+        result = Table._cache_get(key, stats)
+        if result is None:
+            result = compute()
+            Table._cache_put(key, result, stats)
+        return result
+
+    @staticmethod
+    def _cache_get(key: tuple, stats: Stats = None):
+        """Returns the result stored under key, as per _cached, or None."""
+        with Stats.phase_of(stats, "cache"):
+            result = Table.result_cache.get(key)
+            if result is None and Table.persistent_cache is not None:
+                result = Table.persistent_cache.get((Table.cache_version, key))
+                if result is not None:
+                    Table.result_cache.put(key, result)
+                    if stats is not None:
+                        stats.count("persistent_hits")
+        if stats is not None:
+            stats.count("cache_misses" if result is None else "cache_hits")
+        return result
+
+    @staticmethod
+    def _cache_put(key: tuple, result, stats: Stats = None) -> None:
+        """Stores result under key, as per _cached."""
+        with Stats.phase_of(stats, "cache"):
+            Table.result_cache.put(key, result)
+            if Table.persistent_cache is not None:
+                Table.persistent_cache.put((Table.cache_version, key), result)
+
+    @staticmethod
+    def _range_key(ranges) -> tuple[str]:
+        """Converts the ranges argument of probabilities to a tuple of range
+            strings, one per seat as per Simulator's weights.
+        """
+        if ranges is None:
+            return (HandRange.default,)
+        if isinstance(ranges, str):
+            return (ranges,)
+        if not isinstance(ranges, (list, tuple)) or not ranges:
+            raise TypeError(f"Optional argument ranges must be a str or a non-empty list of str, not {ranges!r}")
+        for hand_range in ranges:
+            if not isinstance(hand_range, str):
+                raise TypeError(f"All elements of optional argument ranges must be of type str, not {type(hand_range)}")
+        return tuple(ranges)
+
+    def _get_simulator(self, ranges = None, stats: Stats = None) -> Simulator:
+        """Returns a Simulator for the current table state and the given 
+            ranges, as per probabilities. It is built once per state and 
+            ranges, and shared by every probabilities call until community
+            cards are added, whatever the number of opponents.
+        """
+        ranges = Table._range_key(ranges)
+        simulator: Simulator = self._simulators.get(ranges)
+        if simulator is None:
+            with Stats.phase_of(stats, "strengths"):
+                evaluated: int = self.holdings.evaluated
+                # Find the player's hand strength
+                player_strength: dict = CompactHand(self.player + self.community_cards).best_hand()
+
+                # Stores the strength of every possible opponent hand. Doing this now saves a lot of computation time 
+                # later.
+                simulator = Simulator(*self._holding_strengths(ranges), player_strength)
+                self._simulators[ranges] = simulator
+            if stats is not None:
+                stats.count("hands_evaluated", 1 + self.holdings.evaluated - evaluated)
+        return simulator
+
+    def _holding_strengths(self, ranges: tuple[str]) -> tuple[np.ndarray]:
+        """Rates every possible opponent holding together with the community
+            cards, and weighs it in each of the given ranges.
+
+        The holdings are relabeled to the canonical suits of the table 
+            state, as per SuitIsomorphism.canonical_permutation, and listed 
+            in the order of a table dealt those cards. Every suit-equivalent
+            state so gets the same Simulator and, for a seed, samples the 
+            same deals, which keeps seeded results independent of the cache.
+
+        Returns: A tuple of five arrays, as per the positional arguments of 
+            Simulator: the deck positions of each holding's two cards, its 
+            value, its level, and its weight in each range.
+        """
+        permutation: np.ndarray = self._canonical_permutation()
+        first_ids: np.ndarray = permutation[self.holdings.first_ids]
+        second_ids: np.ndarray = permutation[self.holdings.second_ids]
+        low, high = np.minimum(first_ids, second_ids), np.maximum(first_ids, second_ids)
+        order: np.ndarray = np.lexsort((high, low))
+        low, high = low[order], high[order]
+        card_ids: np.ndarray = np.sort(permutation[self.holdings.card_ids])
+        values, levels = self.holdings.strengths()
+        weights: np.ndarray = np.stack([HandRange.holding_weights(hand_range, low, high) for hand_range in ranges])
+        return np.searchsorted(card_ids, low), np.searchsorted(card_ids, high), values[order], levels[order], weights
+
+    def _canonical_permutation(self) -> np.ndarray:
+        """Returns SuitIsomorphism.canonical_permutation of the table state,
+            as an array mapping card ids to relabeled card ids.
+        """
+        return np.array(SuitIsomorphism.canonical_permutation(self.player, self.community_cards), dtype=np.int64)
+
+    @staticmethod
+    def _counts_to_dataframes(counts: np.ndarray, total: int, player_level: int,
+                              exact: bool = False, intervals: bool = False) -> list[pd.DataFrame]:
+        """Converts outcome counts to the DataFrames returned by 
+            probabilities.
+
+        Positional arguments:
+        counts (np.ndarray): The number of samples in each category, as per 
+            Simulator.categorize(), or its probability if exact.
+        total (int): The number of samples counted, or 1 if exact.
+        player_level (int): The level of the player's hand.
+
+        Optional arguments:
+        exact (bool): Whether the counts are exact, i.e. have no sampling 
+            error. Defaults to False.
+        intervals (bool): Whether to add the "Interval" and "Samples" 
+            columns. Defaults to False.
+
+        Returns: As per probabilities.
+        """
+
+        # Dictionary that stores the number of opponents with each hand level. Indexes are the numeric 
+        # representations of each level, as per PokerHand.best_hand()
+        hand_level_counts = {level: counts[3*level+1] for level in range(9)}
+        # These two represent "player's level but weaker" and "player's level 
+        # but stronger," respectively
+        hand_level_counts[player_level-0.25] = counts[3*player_level]
+        hand_level_counts[player_level+0.25] = counts[3*player_level+2]
+        half_widths: np.ndarray = np.zeros(len(counts)) if exact else Simulator.half_widths(counts, total)
+        # Levels other than the player's have only the middle category
+        level_half_widths = {level: half_widths[3*level+1] for level in range(9)}
+        level_half_widths[player_level-0.25] = half_widths[3*player_level]
+        level_half_widths[player_level+0.25] = half_widths[3*player_level+2]
+
         # Splitting the dictionary into same-level, higher-level, and lower-level dicts.
-        # Could be made more efficient by doing this during the loop, but that takes refactoring.
         higher_level_counts: dict = {}
         lower_level_counts: dict = {}
         same_level_counts: dict = {}
@@ -240,13 +836,42 @@ class Table:
         for hand_dict in (higher_level_counts, same_level_counts, lower_level_counts):
             df: pd.DataFrame = pd.DataFrame.from_dict(hand_dict, orient="index", columns = ["Count"])
             df["Level"] = df.index
-            df["Percentage"] = df["Count"].map(lambda x: f"{round(x*100/n_samples, 2)}%")
-            df = df[["Level", "Percentage"]]
+            df["Percentage"] = df["Count"].map(lambda x: f"{round(x*100/total, 2)}%")
+            if intervals:
+                df["Interval"] = df["Level"].map(lambda level: f"±{round(level_half_widths[level]*100, 2)}%")
+                df["Samples"] = "exact" if exact else total
+                df = df[["Level", "Percentage", "Interval", "Samples"]]
+            else:
+                df = df[["Level", "Percentage"]]
             df.sort_index(ascending=False, inplace=True, ignore_index=True)
             hand_dataframes.append(df.copy())
         return hand_dataframes
 
-    def analyze_and_display(self, opponents: list[int]):
+    def analyze_and_display(self, opponents: list[int], stats: Stats = None):
+        """Prints the cards and, for each number of opponents, the 
+            probability of each level of best opponent hand.
+
+        Positional arguments:
+        opponents (list[int]): The numbers of opponents, one column each.
+
+        Optional arguments:
+        stats (Stats): As per probabilities.
+
+        Returns: None
+        """
+        self.display(self.analyze(opponents, stats), stats)
+
+    def analyze(self, opponents: list[int], stats: Stats = None) -> tuple[pd.DataFrame]:
+        """Builds the tables printed by analyze_and_display, without 
+            printing anything.
+
+        Arguments: As per analyze_and_display.
+
+        Returns: A tuple of three pandas DataFrames, with the levels 
+            stronger than, equal to and weaker than the player's, each with
+            a "Level" column and one column of percentages per entry of 
+            opponents.
+        """
         if not isinstance(opponents, list):
             raise TypeError(f"Positional argument opponents must be of type list, not {type(opponents)}")
         for opponent in opponents:
@@ -255,57 +880,74 @@ class Table:
             if (opponent < 1):
                 raise ValueError(f"All elements of positional argument opponents must be at least 1, not {opponent}")
 
-        # Get results for each opponents input
-        results = []
-        for n in opponents:
-            result_n = self.probabilities(n)
-            result_n[0] = result_n[0].rename(columns={'Percentage': n})
-            result_n[1] = result_n[1].rename(columns={'Percentage': n})
-            result_n[2] = result_n[2].rename(columns={'Percentage': n})
-            results.append(result_n)
-            # print(result_n[0].columns)
-            # print(result_n[1].columns)
-            # print(result_n[2].columns)
-
-        # Right now results is a list of list of pandas tables
-        stronger_hand = results[0][0]
-        same_hand = results[0][1]
-        weaker_hand = results[0][2]
-        for i in range(1, len(opponents)):
-            stronger_hand = stronger_hand.merge(results[i][0], how='outer', on='Level')
-            same_hand = same_hand.merge(results[i][1], how='outer', on='Level')
-            weaker_hand = weaker_hand.merge(results[i][2], how='outer', on='Level')
-
-        # Reorder and standardize columns
-        stronger_hand = stronger_hand[["Level"]+opponents]
-        same_hand = same_hand[["Level"]+opponents]
-        weaker_hand = weaker_hand[["Level"]+opponents]
-        # print(stronger_hand.columns)
-        # print(same_hand.columns)
-        # print(weaker_hand.columns)
-
-        # Sort descending by level
-        stronger_hand.sort_values(by="Level", ascending=False, inplace=True)
-        same_hand.sort_values(by="Level", ascending=False, inplace=True)
-        weaker_hand.sort_values(by="Level", ascending=False, inplace=True)
-
-        # Translate numeric levels to names
-        stronger_hand["Level"] = stronger_hand["Level"].map(Table.index_to_level)
-        same_hand["Level"] = same_hand["Level"].map(Table.index_to_level)
-        weaker_hand["Level"] = weaker_hand["Level"].map(Table.index_to_level)
-  
-        # Display
-        import os
-        os.system("cls")
-        # Print cards
-        Card.print_cards(self.player + [Card()] + self.community_cards)
-        # Card.print_cards(self.community_cards)
-
-        # tablefmt options: psql(preferred), plain, simple, grid, pipe, html, outline, etc
-        print(tabulate(stronger_hand, headers=['Hand']+opponents, tablefmt='psql', showindex=False))
-        print(tabulate(same_hand, tablefmt='psql', showindex=False))
-        print(tabulate(weaker_hand, tablefmt='psql', showindex=False))
-        return
+        # Get results for each opponents input, all from one set of samples
+        shared_results = self.shared_probabilities(opponents, stats=stats)
+        with Stats.phase_of(stats, "dataframes"):
+            results = []
+            for n in opponents:
+                result_n = list(shared_results[n])
+                result_n[0] = result_n[0].rename(columns={'Percentage': n})
+                result_n[1] = result_n[1].rename(columns={'Percentage': n})
+                result_n[2] = result_n[2].rename(columns={'Percentage': n})
+                results.append(result_n)
+                # print(result_n[0].columns)
+                # print(result_n[1].columns)
+                # print(result_n[2].columns)
+
+            # Right now results is a list of list of pandas tables
+            stronger_hand = results[0][0]
+            same_hand = results[0][1]
+            weaker_hand = results[0][2]
+            for i in range(1, len(opponents)):
+                stronger_hand = stronger_hand.merge(results[i][0], how='outer', on='Level')
+                same_hand = same_hand.merge(results[i][1], how='outer', on='Level')
+                weaker_hand = weaker_hand.merge(results[i][2], how='outer', on='Level')
+
+            # Reorder and standardize columns
+            stronger_hand = stronger_hand[["Level"]+opponents]
+            same_hand = same_hand[["Level"]+opponents]
+            weaker_hand = weaker_hand[["Level"]+opponents]
+            # print(stronger_hand.columns)
+            # print(same_hand.columns)
+            # print(weaker_hand.columns)
+
+            # Sort descending by level
+            stronger_hand.sort_values(by="Level", ascending=False, inplace=True)
+            same_hand.sort_values(by="Level", ascending=False, inplace=True)
+            weaker_hand.sort_values(by="Level", ascending=False, inplace=True)
+
+            # Translate numeric levels to names
+            stronger_hand["Level"] = stronger_hand["Level"].map(Table.index_to_level)
+            same_hand["Level"] = same_hand["Level"].map(Table.index_to_level)
+            weaker_hand["Level"] = weaker_hand["Level"].map(Table.index_to_level)
+        return stronger_hand, same_hand, weaker_hand
+
+    def display(self, tables: tuple[pd.DataFrame], stats: Stats = None) -> None:
+        """Clears the screen and prints the table's cards followed by the 
+            tables returned by analyze.
+
+        Positional arguments:
+        tables (tuple[pd.DataFrame]): As returned by analyze.
+
+        Optional arguments:
+        stats (Stats): As per probabilities.
+
+        Returns: None
+        """
+        stronger_hand, same_hand, weaker_hand = tables
+        opponents: list = list(stronger_hand.columns[1:])
+        with Stats.phase_of(stats, "display"):
+            # Display
+            import os
+            os.system("cls")
+            # Print cards
+            Card.print_cards(self.player + [Card()] + self.community_cards)
+            # Card.print_cards(self.community_cards)
+
+            # tablefmt options: psql(preferred), plain, simple, grid, pipe, html, outline, etc
+            print(tabulate(stronger_hand, headers=['Hand']+opponents, tablefmt='psql', showindex=False))
+            print(tabulate(same_hand, tablefmt='psql', showindex=False))
+            print(tabulate(weaker_hand, tablefmt='psql', showindex=False))
     
     @staticmethod
     def index_to_level(index: float) -> str:
@@ -331,3 +973,12 @@ class Table:
             case 0.25:
                 base_level: int = index-0.25
                 return f"{Table.index_level_pairs[base_level]} (Higher)"
+
+
+def _branch_counts(player_ids: list[int], community_ids: list[int], arguments: tuple) -> dict:
+    # Analyzes one board of Table.next_cards in a worker process.
+    opponents, n_samples, seed, ranges = arguments
+    table: Table = Table()
+    table.manual_game(*[Card.from_id(card_id) for card_id in player_ids])
+    table.add_community(*[Card.from_id(card_id) for card_id in community_ids])
+    return table._shared_probability_counts(opponents, n_samples, seed=seed, ranges=ranges)
@@ -0,0 +1,233 @@
+"""Benchmarks of the hot paths of Card, Deck, PokerHand, CompactHand and Table.
+
+Every benchmark uses fixed cards and seeds, so runs are comparable. Results
+are written as JSON, and can be compared against a saved baseline:
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --baseline baseline.json --threshold 0.2
+
+The second command exits with status 1 if any benchmark's median time is
+more than 20% slower than in the baseline. The result cache is disabled
+while benchmarks run, and Table.probabilities is timed without the
+preflop table, so every run does the full computation. The Table cases
+reuse one table per street, built before timing, so they time the analysis
+alone; the table.setup cases time building the tables.
+"""
+
+from Card import Card
+from CompactHand import CompactHand
+from Deck import Deck
+from HandEvaluator import HandEvaluator
+from PokerHand import PokerHand
+from Table import Table
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import numpy as np
+
+SEED = 0
+STREETS = {
+    "preflop": [],
+    "flop": ["QS", "7H", "2D"],
+    "turn": ["QS", "7H", "2D", "9C"],
+    "river": ["QS", "7H", "2D", "9C", "KH"],
+}
+PLAYER = ["AS", "KD"]
+OPPONENTS = [1, 2, 4, 9]
+DISPLAY_OPPONENTS = [4, 2]
+# One 7-card hand of each level, as per PokerHand.best_hand()
+HANDS = {
+    "high_card": ["AS", "JD", "9C", "7H", "5S", "3D", "2C"],
+    "pair": ["AS", "AD", "9C", "7H", "5S", "3D", "2C"],
+    "two_pair": ["AS", "AD", "9C", "9H", "5S", "3D", "2C"],
+    "three_of_a_kind": ["AS", "AD", "AC", "7H", "5S", "3D", "2C"],
+    "straight": ["9S", "8D", "7C", "6H", "5S", "KD", "2C"],
+    "flush": ["AH", "JH", "9H", "7H", "5H", "3D", "2C"],
+    "full_house": ["AS", "AD", "AC", "7H", "7S", "3D", "2C"],
+    "four_of_a_kind": ["AS", "AD", "AC", "AH", "5S", "3D", "2C"],
+    "straight_flush": ["9H", "8H", "7H", "6H", "5H", "3D", "2C"],
+}
+
+
+@contextlib.contextmanager
+def silenced():
+    # Sends this process's and its children's output to the null device,
+    # since analyze_and_display prints and clears the screen.
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = os.dup(1), os.dup(2)
+    with open(os.devnull, "w") as null:
+        os.dup2(null.fileno(), 1)
+        os.dup2(null.fileno(), 2)
+        try:
+            with contextlib.redirect_stdout(null):
+                yield
+        finally:
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+
+
+def new_table(street: str) -> Table:
+    table: Table = Table()
+    table.manual_game(*[Card(card) for card in PLAYER])
+    if STREETS[street]:
+        table.add_community(*[Card(card) for card in STREETS[street]])
+    return table
+
+
+def benchmarks() -> list[tuple]:
+    """Lists every benchmark as a tuple of its name, the number of times to
+        call it per timing, and the function to call.
+    """
+    cases: list[tuple] = []
+
+    # Card
+    cases.append(("card.construct", 10000, lambda: [Card("Q", "H") for _ in range(100)]))
+    cases.append(("card.construct_string", 10000, lambda: [Card("QH") for _ in range(100)]))
+    shuffled: list[Card] = [Card.from_id(card_id) for card_id in range(52)]
+    random.Random(SEED).shuffle(shuffled)
+    cases.append(("card.sort", 10000, lambda: sorted(shuffled)))
+
+    # Deck
+    # A shuffle is lazy, so these also deal the whole deck to time the
+    # Fisher–Yates steps it defers
+    def deck_shuffle():
+        deck: Deck = Deck()
+        deck.shuffle()
+        list(deck)
+    def deck_shuffle_draw():
+        deck: Deck = Deck()
+        deck.shuffle()
+        deck.draw(len(deck))
+    def deck_draw():
+        deck: Deck = Deck()
+        deck.draw(len(deck))
+    def deck_remove():
+        deck: Deck = Deck()
+        for card_id in range(0, 52, 3):
+            deck.remove(Card.from_id(card_id))
+    cases.append(("deck.shuffle", 1000, deck_shuffle))
+    cases.append(("deck.shuffle_draw", 1000, deck_shuffle_draw))
+    cases.append(("deck.draw", 1000, deck_draw))
+    cases.append(("deck.remove", 1000, deck_remove))
+
+    # PokerHand
+    for name, cards in HANDS.items():
+        hand_cards: list[Card] = [Card(card) for card in cards]
+        cases.append((f"pokerhand.best_hand.{name}", 1000, lambda hand_cards=hand_cards:
+                      PokerHand(list(hand_cards)).best_hand()))
+        cases.append((f"compacthand.best_hand.{name}", 1000, lambda hand_cards=hand_cards:
+                      CompactHand(hand_cards).best_hand()))
+    board: CompactHand = CompactHand([Card(card) for card in STREETS["turn"]])
+    cases.append(("compacthand.with_card", 10000, lambda: [board.with_card(Card.from_id(card_id))
+                                                           for card_id in (0, 13, 26, 39, 51)]))
+
+    # Table
+    tables: dict[str, Table] = {street: new_table(street) for street in STREETS}
+    for street in STREETS:
+        cases.append((f"table.setup.{street}", 10, lambda street=street: new_table(street)))
+    for street in STREETS:
+        for opponents in OPPONENTS:
+            cases.append((f"table.probabilities.{street}.{opponents}", 1,
+                          lambda table=tables[street], opponents=opponents:
+                          table.probabilities(opponents, seed=SEED, preflop_table=False, cache=False)))
+    for street in STREETS:
+        def analyze(table=tables[street]):
+            with silenced():
+                table.analyze_and_display(list(DISPLAY_OPPONENTS))
+        cases.append((f"table.analyze_and_display.{street}", 1, analyze))
+    return cases
+
+
+def run(repeat: int = 5, pattern: str = None) -> dict:
+    """Runs the benchmarks and returns their results.
+
+    Optional arguments:
+    repeat (int): The number of timings of each benchmark. Defaults to 5.
+    pattern (str): Runs only the benchmarks whose names contain it. Defaults
+        to None, which runs every benchmark.
+
+    Returns: A dictionary as written by the command line, with the median
+        and minimum time per call of each benchmark, in seconds.
+    """
+    # Lookup tables are built once per process; keep that out of the timings.
+    HandEvaluator.build_tables()
+    HandEvaluator._build_batch_tables()
+    saved_size: int = Table.result_cache.maxsize
+    Table.result_cache.resize(0)
+    results: dict = {}
+    try:
+        for name, number, function in benchmarks():
+            if pattern is not None and pattern not in name:
+                continue
+            random.seed(SEED)
+            np.random.seed(SEED)
+            function()
+            timings: list[float] = []
+            for _ in range(repeat):
+                start: float = time.perf_counter()
+                for _ in range(number):
+                    function()
+                timings.append((time.perf_counter() - start) / number)
+            results[name] = {"median": statistics.median(timings), "min": min(timings),
+                             "repeat": repeat, "number": number}
+    finally:
+        Table.result_cache.resize(saved_size)
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Lists the benchmarks whose median time is more than threshold (a
+        fraction) slower than in the baseline.
+    """
+    regressions: list[str] = []
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before: float = baseline["results"][name]["median"]
+        if result["median"] > before * (1 + threshold):
+            regressions.append(f"{name}: {before*1000:.3f}ms -> {result['median']*1000:.3f}ms "
+                               f"({result['median']/before - 1:+.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of Card, Deck, PokerHand, CompactHand and Table.")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="compare against the results in this file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="slowdown relative to the baseline that counts as a regression (default: 0.2)")
+    parser.add_argument("--repeat", type=int, default=5, help="timings per benchmark (default: 5)")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose names contain this")
+    arguments = parser.parse_args()
+
+    results = run(arguments.repeat, arguments.filter)
+    for name, result in results["results"].items():
+        print(f"{name:45} {result['median']*1000:10.3f}ms")
+    if arguments.output is not None:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, arguments.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {arguments.threshold:.0%}:")
+            for regression in regressions:
+                print("  " + regression)
+            sys.exit(1)
+        print(f"\nNo regressions beyond {arguments.threshold:.0%}.")
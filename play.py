@@ -1,9 +1,29 @@
 from Card import Card
-from Deck import Deck
-from PokerHand import PokerHand
 from Table import Table
+from concurrent.futures import Future, ThreadPoolExecutor
 
 OPPONENTS = [4, 2]
+STREETS = [("flop", 3), ("turn", 1), ("river", 1)]
+
+def analyze_upcoming(executor: ThreadPoolExecutor, table: Table, num_cards: int) -> Future:
+    # The deck is already shuffled, so the next cards are known: analyze a
+    # copy of the table with them dealt while the player reads the screen.
+    cards: tuple[Card] = table.deck.peek(num_cards)
+    upcoming: Table = table.copy()
+    def analyze():
+        upcoming.add_community(*cards)
+        return upcoming.analyze(OPPONENTS)
+    return executor.submit(analyze)
+
+def play_streets(table: Table):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        for street, num_cards in STREETS:
+            upcoming: Future = analyze_upcoming(executor, table, num_cards)
+            input(f"Hit Enter for the {street}")
+            if not upcoming.done():
+                print("Analyzing...")
+            table.draw_community(num_cards = num_cards)
+            table.display(upcoming.result())
 
 def random_game():
     table: Table = Table()
@@ -13,23 +33,7 @@ def random_game():
     table.new_game()
     table.analyze_and_display(opponents=OPPONENTS)
 
-    # Flop
-    input("Hit Enter for the flop")
-    print("Analyzing...")
-    table.draw_community(num_cards = 3)
-    table.analyze_and_display(opponents=OPPONENTS)
-
-    # Turn
-    input("Hit Enter for the turn")
-    print("Analyzing...")
-    table.draw_community(num_cards = 1)
-    table.analyze_and_display(opponents=OPPONENTS)
-
-    # River
-    input("Hit Enter for the river")
-    print("Analyzing...")
-    table.draw_community(num_cards = 1)
-    table.analyze_and_display(opponents=OPPONENTS)
+    play_streets(table)
 
 def manual_game():
 
@@ -73,23 +77,7 @@ def manual_game():
     table.manual_game(card1, card2)
     table.analyze_and_display(opponents=OPPONENTS)
 
-    # Flop
-    input("Hit Enter for the flop")
-    print("Analyzing...")
-    table.draw_community(num_cards = 3)
-    table.analyze_and_display(opponents=OPPONENTS)
-
-    # Turn
-    input("Hit Enter for the turn")
-    print("Analyzing...")
-    table.draw_community(num_cards = 1)
-    table.analyze_and_display(opponents=OPPONENTS)
-
-    # River
-    input("Hit Enter for the river")
-    print("Analyzing...")
-    table.draw_community(num_cards = 1)
-    table.analyze_and_display(opponents=OPPONENTS)
+    play_streets(table)
 
 def play_game():
     play_mode = input("/Manual/ game or /Random/ game? ").lower()
@@ -0,0 +1,48 @@
+from BatchRunner import BatchRunner
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import pytest
+
+scenarios: pd.DataFrame = pd.DataFrame({
+    "player": ["AS KD", "ASKD", "QH,QD", "7C 2D", "JS TS", "AS AX", "9H 9D", "KC QC"],
+    "board": ["", "QS 7H 2D", "QS 7H 2D 9C KH", "", "9S 8S 2H", "", "9C 4S 4D KH", "AC 2C 3D"],
+    "opponents": ["2", "1;4", "3", "9", "2,3", "2", "x", "1"],
+})
+
+
+@pytest.fixture
+def input_path(tmp_path):
+    path = tmp_path / "scenarios.csv"
+    scenarios.to_csv(path, index=False)
+    return str(path)
+
+
+def test_results_ignore_chunks_and_workers(input_path, tmp_path):
+    outputs: list[pd.DataFrame] = []
+    for chunksize, workers in [(100, None), (3, 2), (1, None)]:
+        output_path: str = str(tmp_path / f"results_{chunksize}_{workers}.csv")
+        runner: BatchRunner = BatchRunner(n_samples=500, seed=7, workers=workers, chunksize=chunksize)
+        assert runner.run(input_path, output_path) == len(scenarios)
+        outputs.append(pd.read_csv(output_path, keep_default_na=False))
+    for output in outputs[1:]:
+        pd.testing.assert_frame_equal(output, outputs[0])
+
+
+def test_bad_rows_are_reported(input_path):
+    runner: BatchRunner = BatchRunner(n_samples=500, seed=7)
+    results: pd.DataFrame = pd.concat(list(map(runner.analyze, runner.read(input_path))))
+    errors: pd.DataFrame = results[results["error"] != ""]
+    assert errors["row"].tolist() == [5, 6]
+    assert errors["win"].isna().all()
+    good: pd.DataFrame = results[results["error"] == ""]
+    assert good["row"].tolist() == [0, 1, 1, 2, 3, 4, 4, 7]
+    assert good["opponents"].tolist() == [2, 1, 4, 3, 9, 2, 3, 1]
+    assert (good[["win", "tie", "loss"]].sum(axis=1) - 1).abs().max() < 1e-9
+
+
+def test_analyze_with_a_pool_of_its_own(input_path):
+    runner: BatchRunner = BatchRunner(n_samples=500, seed=7)
+    chunk: pd.DataFrame = next(runner.read(input_path))
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pooled: pd.DataFrame = runner.analyze(chunk, pool)
+    pd.testing.assert_frame_equal(pooled, runner.analyze(chunk))
@@ -0,0 +1,53 @@
+from Card import Card
+from CompactHand import CompactHand
+from PokerHand import PokerHand
+import pickle
+import random
+import pytest
+
+deck: list[Card] = [Card.from_id(card_id) for card_id in range(52)]
+
+
+def test_with_card_matches_building_from_scratch():
+    rng = random.Random(4)
+    for _ in range(500):
+        cards: list[Card] = rng.sample(deck, 7)
+        hand: CompactHand = CompactHand()
+        for card in cards:
+            hand = hand.with_card(card)
+        built: CompactHand = CompactHand(cards)
+        assert hand == built and hash(hand) == hash(built)
+        assert (hand.rank_key, hand.suit_key, hand.suit_masks) == (built.rank_key, built.suit_key, built.suit_masks)
+        assert hand.best_hand() == PokerHand(cards).best_hand()
+        assert set(hand.cards) == set(cards) and len(hand) == 7
+
+
+def test_with_card_leaves_the_hand_alone():
+    board: CompactHand = CompactHand(Card.parse_many("QS 7H 2D"))
+    turn: CompactHand = board.with_card(Card("Q", "H"))
+    assert len(board) == 3 and Card("Q", "H") not in board
+    assert board.best_hand()["level"] == 0 and turn.best_hand()["level"] == 1
+    with pytest.raises(AttributeError):
+        board.mask = 0
+
+
+def test_rejects_bad_cards():
+    hand: CompactHand = CompactHand(Card.parse_many("AS KD"))
+    with pytest.raises(ValueError, match="already"):
+        hand.with_card(Card("A", "S"))
+    with pytest.raises(ValueError, match="blank"):
+        hand.with_card(Card())
+    with pytest.raises(ValueError, match="blank"):
+        CompactHand([Card("A", "S"), Card()])
+    with pytest.raises(TypeError):
+        hand.with_card("AS")
+    with pytest.raises(ValueError, match="at most 7"):
+        CompactHand(deck[:8])
+    with pytest.raises(ValueError, match="at most 7"):
+        CompactHand(deck[:7]).with_card(deck[7])
+
+
+def test_pickles():
+    hand: CompactHand = CompactHand(Card.parse_many("AS KD QS 7H 2D"))
+    copy: CompactHand = pickle.loads(pickle.dumps(hand))
+    assert copy == hand and copy.best_hand() == hand.best_hand()
@@ -0,0 +1,69 @@
+from Card import Card
+from Deck import Deck
+from collections import Counter
+import random
+import pytest
+
+
+def test_new_deck_order_and_membership():
+    deck: Deck = Deck()
+    assert len(deck) == 52 and len(set(deck.cards)) == 52
+    # The top of the deck is the end of cards
+    top: Card = deck.cards[-1]
+    assert deck.draw(1) == (top,) and top not in deck
+    deck.remove(Card("Q", "S"))
+    assert Card("Q", "S") not in deck and len(deck) == 50
+    with pytest.raises(ValueError):
+        deck.remove(Card("Q", "S"))
+
+
+def test_draw_matches_peek_and_cards():
+    random.seed(1)
+    deck: Deck = Deck()
+    deck.shuffle()
+    for card_id in range(0, 52, 5):
+        deck.remove(Card.from_id(card_id))
+    peeked: tuple = deck.peek(6)
+    assert deck.peek(6) == peeked
+    assert deck.draw(2) + deck.draw(4) == peeked
+    cards: list[Card] = deck.cards
+    assert len(cards) == len(deck) == 52 - 11 - 6
+    # Iterating fixes the order, top card last
+    assert deck.draw(3) == tuple(reversed(cards[-3:]))
+    assert not set(peeked) & set(deck.cards)
+    assert deck.card_ids() == sorted(card.id for card in deck.cards)
+
+
+def test_copy_deals_the_same_cards():
+    random.seed(2)
+    deck: Deck = Deck()
+    deck.shuffle()
+    deck.remove(Card("K", "H"))
+    copy: Deck = deck.copy()
+    assert copy.draw(10) == deck.draw(10)
+    # Drawing from the copy leaves the original alone
+    drawn: tuple = copy.draw(5)
+    assert len(copy) == 36 and len(deck) == 41
+    assert deck.peek(5) == drawn
+
+
+def test_shuffle_is_uniform():
+    # Each card reaches the top of a 4-card deck about equally often
+    random.seed(3)
+    tops: Counter = Counter()
+    for _ in range(8000):
+        deck: Deck = Deck()
+        for card_id in range(4, 52):
+            deck.remove(Card.from_id(card_id))
+        deck.shuffle()
+        tops[deck.draw(1)[0].id] += 1
+    assert set(tops) == {0, 1, 2, 3}
+    assert all(1800 < count < 2200 for count in tops.values())
+
+
+def test_reset_restores_every_card():
+    deck: Deck = Deck()
+    deck.shuffle()
+    deck.draw(30)
+    deck.reset()
+    assert len(deck) == 52 and deck.cards == Deck().cards
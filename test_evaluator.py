@@ -0,0 +1,52 @@
+from Card import Card
+from HandEvaluator import HandEvaluator
+from PokerHand import PokerHand
+import random
+import numpy as np
+import pytest
+
+deck: list[Card] = [Card.from_id(card_id) for card_id in range(52)]
+
+
+def cascade(cards: list[Card]) -> dict:
+    # Rates a hand with PokerHand's detector methods, without the tables
+    PokerHand.use_tables = False
+    try:
+        return PokerHand(cards).best_hand()
+    finally:
+        PokerHand.use_tables = True
+
+
+@pytest.mark.parametrize("size", [5, 6, 7])
+def test_tables_match_cascade(size):
+    rng = random.Random(size)
+    hands: list[list[Card]] = [rng.sample(deck, size) for _ in range(3000)]
+    values, levels = HandEvaluator.evaluate_batch(np.array([[card.id for card in hand] for hand in hands]))
+    for hand, value, level in zip(hands, values, levels):
+        expected: dict = cascade(hand)
+        assert PokerHand(hand).best_hand() == expected
+        assert (int(value), int(level)) == (expected["value"], expected["level"])
+
+
+def test_more_than_seven_cards():
+    hand: list[Card] = random.Random(8).sample(deck, 8)
+    assert PokerHand(hand).best_hand() == cascade(hand)
+
+
+@pytest.mark.parametrize("size", [7, 8])
+def test_rate_batch_checks_hand_size(size):
+    HandEvaluator._build_batch_tables()
+    tables: dict = HandEvaluator.batch_tables
+    hand: list[int] = [card.id for card in random.Random(size).sample(deck, size)]
+    suit_masks: np.ndarray = np.zeros((1, 4), dtype=np.int64)
+    for card_id in hand:
+        suit_masks[0, card_id & 3] |= tables["rank_bits"][card_id]
+    keys: tuple = (tables["rank_keys"][hand].sum(keepdims=True), tables["suit_keys"][hand].sum(keepdims=True),
+                   suit_masks)
+    if size <= 7:
+        values, levels = HandEvaluator.rate_batch(*keys)
+        expected: dict = cascade([Card.from_id(card_id) for card_id in hand])
+        assert (int(values[0]), int(levels[0])) == (expected["value"], expected["level"])
+    else:
+        with pytest.raises(ValueError):
+            HandEvaluator.rate_batch(*keys)
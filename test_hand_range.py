@@ -0,0 +1,37 @@
+from Card import Card
+from HandRange import HandRange
+import numpy as np
+import pytest
+
+
+def test_parse_forms():
+    assert HandRange.parse("QQ+, AKs, ATo+:0.5, 76s") == {
+        "QQ": 1.0, "KK": 1.0, "AA": 1.0, "AKs": 1.0,
+        "ATo": 0.5, "AJo": 0.5, "AQo": 0.5, "AKo": 0.5, "76s": 1.0,
+    }
+    assert HandRange.parse("99-77") == {"77": 1.0, "88": 1.0, "99": 1.0}
+    assert HandRange.parse("KTs-K8s") == {"K8s": 1.0, "K9s": 1.0, "KTs": 1.0}
+    assert HandRange.parse("KQ") == {"KQs": 1.0, "KQo": 1.0}
+    # The last weight of a class wins
+    assert HandRange.parse("AA:0.2, AA") == {"AA": 1.0}
+
+
+@pytest.mark.parametrize("text", ["AX", "AAs", "KQs-J9s", "AK:-1", "AK:x", "99-AKs"])
+def test_parse_rejects_invalid_tokens(text):
+    with pytest.raises(ValueError):
+        HandRange.parse(text)
+
+
+def test_compile_counts_combinations():
+    weights: np.ndarray = HandRange.compile("AA, AKs:0.5, 72o")
+    # 6 combinations of a pair, 4 of a suited hand and 12 of an offsuit one
+    assert (weights > 0).sum() == 6 + 4 + 12
+    assert weights.sum() == 6 + 4*0.5 + 12
+    assert not weights.flags.writeable
+
+
+def test_holding_weights_look_up_either_order():
+    ace_spades, king_spades, king_hearts = Card.parse_many("AS KS KH")
+    first: np.ndarray = np.array([ace_spades.id, king_spades.id, ace_spades.id])
+    second: np.ndarray = np.array([king_spades.id, ace_spades.id, king_hearts.id])
+    assert HandRange.holding_weights("AKs", first, second).tolist() == [1.0, 1.0, 0.0]
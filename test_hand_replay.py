@@ -0,0 +1,67 @@
+from Card import Card
+from HandReplay import HandReplay
+import pytest
+
+history: list[str] = [
+    "# A session",
+    "Hand: 1",
+    "Player: AS KD",
+    "Flop: QS 7H 2D",
+    '{"id": "2", "player": "QH QD", "flop": "QS 7H 2D", "turn": "9C", "river": "KH", "opponents": [1, 3]}',
+    "hole: 7c 2d",
+    "Opponents: 2;4",
+    "",
+    "",
+    "Hand: 4",
+    "Player: JS TS",
+    "Flop: 9S8S2H",
+    "Turn: 3C",
+]
+
+
+def test_parse_mixed_history_in_order():
+    hands: list[dict] = list(HandReplay.parse(history))
+    assert [hand["id"] for hand in hands] == ["1", "2", None, "4"]
+    assert hands[0]["player"] == Card.parse_many("AS KD")
+    assert hands[0]["flop"] == Card.parse_many("QS 7H 2D")
+    assert "turn" not in hands[0] and hands[0]["opponents"] is None
+    assert hands[1]["river"] == [Card("K", "H")]
+    assert hands[1]["opponents"] == [1, 3]
+    assert hands[2]["player"] == Card.parse_many("7C 2D")
+    assert hands[2]["opponents"] == [2, 4]
+    assert hands[3]["flop"] == Card.parse_many("9S 8S 2H")
+    assert hands[3]["turn"] == [Card("3", "C")]
+
+
+def test_parse_is_lazy():
+    lines = iter(history)
+    hands = HandReplay.parse(lines)
+    assert next(hands)["id"] == "1"
+    # Only read up to the JSON line that ended the first hand
+    assert next(lines).startswith("hole")
+
+
+@pytest.mark.parametrize("lines, message", [
+    (["Hand: 1", "Flop: QS 7H 2D"], "no player cards"),
+    (["Player: AS"], "2 cards"),
+    (['{"player": "AS KD", "flop": "QS 7H"}'], "3 card"),
+])
+def test_parse_rejects_bad_hands(lines, message):
+    with pytest.raises(ValueError, match=message):
+        list(HandReplay.parse(lines))
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_replay_yields_each_street(tmp_path, prefetch):
+    path = tmp_path / "history.txt"
+    path.write_text("\n".join(history) + "\n")
+    replay: HandReplay = HandReplay([2], n_samples=200, seed=1, prefetch=prefetch)
+    streets: list[tuple] = [(result["id"], result["street"], len(result["board"]), sorted(result["results"]))
+                            for result in replay.replay(str(path))]
+    assert streets == [
+        ("1", "preflop", 0, [2]), ("1", "flop", 3, [2]),
+        ("2", "preflop", 0, [1, 3]), ("2", "flop", 3, [1, 3]), ("2", "turn", 4, [1, 3]),
+        ("2", "river", 5, [1, 3]),
+        (None, "preflop", 0, [2, 4]),
+        ("4", "preflop", 0, [2]), ("4", "flop", 3, [2]), ("4", "turn", 4, [2]),
+    ]
@@ -0,0 +1,56 @@
+from Card import Card
+from PersistentCache import PersistentCache
+from Table import Table
+import time
+import numpy as np
+
+
+def test_round_trips_values(tmp_path):
+    cache: PersistentCache = PersistentCache(tmp_path / "cache.sqlite")
+    key: tuple = ((0, 5), 3, None, "shared")
+    value: dict = {2: (np.arange(3, dtype=np.int64), 100, 1, False)}
+    cache.put(key, value)
+    stored = PersistentCache(tmp_path / "cache.sqlite").get(key)
+    assert list(stored) == [2]
+    counts, total, level, exact = stored[2]
+    assert counts.dtype == np.int64 and counts.tolist() == [0, 1, 2]
+    assert (total, level, exact) == (100, 1, False)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache: PersistentCache = PersistentCache(tmp_path / "cache.sqlite", maxsize=2)
+    cache.put("a", 1)
+    time.sleep(0.01)
+    cache.put("b", 2)
+    time.sleep(0.01)
+    assert cache.get("a") == 1
+    time.sleep(0.01)
+    cache.put("c", 3)
+    assert len(cache) == 2
+    assert "b" not in cache and "a" in cache and "c" in cache
+
+
+def test_other_schema_versions_are_dropped(tmp_path, monkeypatch):
+    PersistentCache(tmp_path / "cache.sqlite").put("a", 1)
+    monkeypatch.setattr(PersistentCache, "schema_version", PersistentCache.schema_version + 1)
+    assert len(PersistentCache(tmp_path / "cache.sqlite")) == 0
+
+
+def test_table_results_are_keyed_by_cache_version(tmp_path, monkeypatch):
+    cache: PersistentCache = PersistentCache(tmp_path / "cache.sqlite")
+    monkeypatch.setattr(Table, "persistent_cache", cache)
+    table: Table = Table()
+    table.manual_game(*Card.parse_many("AS KD"))
+    table.add_community(*Card.parse_many("QS 7H 2D"))
+
+    Table.result_cache.clear()
+    table.probabilities(3, n_samples=1000, seed=1)
+    Table.result_cache.clear()
+    table.probabilities(3, n_samples=1000, seed=1)
+    assert cache.hits == 1
+
+    monkeypatch.setattr(Table, "cache_version", Table.cache_version + 1)
+    Table.result_cache.clear()
+    table.probabilities(3, n_samples=1000, seed=1)
+    assert cache.hits == 1
+    Table.result_cache.clear()
@@ -0,0 +1,40 @@
+from Card import Card
+from ResultCache import ResultCache
+from SuitIsomorphism import SuitIsomorphism
+
+
+def test_canonical_key_ignores_suit_names():
+    key: tuple = SuitIsomorphism.canonical_key(Card.parse_many("AS KS"), Card.parse_many("QS JH 2D"))
+    assert key == SuitIsomorphism.canonical_key(Card.parse_many("KH AH"), Card.parse_many("2D QH JC"))
+    # Suited and offsuit holdings are different states
+    assert key != SuitIsomorphism.canonical_key(Card.parse_many("AS KH"), Card.parse_many("QS JH 2D"))
+
+
+def test_canonical_permutation_gives_canonical_key():
+    player: list[Card] = Card.parse_many("7C 7D")
+    community: list[Card] = Card.parse_many("2H 9H KS")
+    permutation: list[int] = SuitIsomorphism.canonical_permutation(player, community)
+    assert SuitIsomorphism.canonical_key(player, community) == (
+        tuple(sorted(permutation[card.id] for card in player)),
+        tuple(sorted(permutation[card.id] for card in community)))
+
+
+def test_evicts_least_recently_used():
+    cache: ResultCache = ResultCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.get("b", "missing") == "missing"
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    cache.resize(1)
+    assert len(cache) == 1 and "c" in cache
+
+
+def test_size_zero_stores_nothing():
+    cache: ResultCache = ResultCache(maxsize=0)
+    cache.put("a", 1)
+    assert len(cache) == 0 and cache.get("a") is None
@@ -0,0 +1,70 @@
+from Card import Card
+from HandRange import HandRange
+from PokerHand import PokerHand
+from Simulator import Simulator
+import itertools
+import numpy as np
+
+deck: list[Card] = [Card.from_id(card_id) for card_id in range(52)]
+
+
+def rate(cards: list[Card]) -> dict:
+    # Rates a hand with PokerHand's detector methods, without the tables
+    PokerHand.use_tables = False
+    try:
+        return PokerHand(cards).best_hand()
+    finally:
+        PokerHand.use_tables = True
+
+
+def river_simulator(player: list[Card], board: list[Card], ranges: list[str]) -> Simulator:
+    # Builds a Simulator over every holding left, rated with PokerHand's detectors
+    left: list[Card] = [card for card in deck if card not in player + board]
+    holdings: list[tuple[int]] = list(itertools.combinations(range(len(left)), 2))
+    first: np.ndarray = np.array([i for i, j in holdings])
+    second: np.ndarray = np.array([j for i, j in holdings])
+    strengths: list[dict] = [rate([left[i], left[j]] + board) for i, j in holdings]
+    first_ids: np.ndarray = np.array([left[i].id for i in first])
+    second_ids: np.ndarray = np.array([left[j].id for j in second])
+    weights: np.ndarray = np.stack([HandRange.holding_weights(hand_range, first_ids, second_ids)
+                                    for hand_range in ranges])
+    return Simulator(first, second, np.array([strength["value"] for strength in strengths]),
+                     np.array([strength["level"] for strength in strengths]), weights, rate(player + board))
+
+
+def category(simulator: Simulator, holding: int) -> int:
+    level: int = int(simulator.levels[holding])
+    player: dict = simulator.player_strength
+    if level != player["level"]:
+        return 3*level + 1
+    return 3*level + 1 + int(np.sign(int(simulator.values[holding]) - player["value"]))
+
+
+def test_exact_counts_match_enumeration():
+    player: list[Card] = Card.parse_many("AS KD")
+    board: list[Card] = Card.parse_many("QS 7H 2D 9C KH")
+    simulator: Simulator = river_simulator(player, board, ["22+, AK, KQs:0.5", HandRange.default])
+    first, second = simulator.first, simulator.second
+    weights: np.ndarray = simulator.weights
+
+    # One opponent: the seat's weight of each holding
+    expected: np.ndarray = np.zeros(Simulator.n_categories)
+    for holding in range(len(first)):
+        expected[category(simulator, holding)] += weights[0, holding]
+    counts, total = simulator.exact_counts(1)
+    assert total == 1
+    assert np.allclose(counts, expected / weights[0].sum())
+
+    # Two opponents, dealt in turn: the second seat draws among the
+    # holdings that share no card with the first
+    expected = np.zeros(Simulator.n_categories)
+    cards: list[set] = [{first[holding], second[holding]} for holding in range(len(first))]
+    for one in np.flatnonzero(weights[0]):
+        free: list[int] = [two for two in np.flatnonzero(weights[1]) if not cards[one] & cards[two]]
+        free_weight: float = weights[1, free].sum()
+        for two in free:
+            best: int = one if simulator.values[one] >= simulator.values[two] else two
+            expected[category(simulator, best)] += weights[0, one] / weights[0].sum() * weights[1, two] / free_weight
+    counts, total = simulator.exact_counts(2)
+    assert np.isclose(counts.sum(), 1)
+    assert np.allclose(counts, expected)
@@ -0,0 +1,70 @@
+from Card import Card
+from Table import Table
+import pytest
+
+
+def make_table(player: str, board: str) -> Table:
+    table: Table = Table()
+    table.manual_game(*Card.parse_many(player))
+    table.add_community(*Card.parse_many(board))
+    return table
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    Table.result_cache.clear()
+    yield
+    Table.result_cache.clear()
+
+
+def test_seeded_results_ignore_suit_relabeling():
+    # The same state up to suits, and so one cache entry
+    first: Table = make_table("AS KS", "QS JH 2D")
+    second: Table = make_table("AH KH", "QH JC 2D")
+    results: list = []
+    for cache in (False, True):
+        for table in (first, second):
+            results.append(table.probabilities(3, n_samples=5000, seed=1, cache=cache))
+    for result in results[1:]:
+        for frame, expected in zip(result, results[0]):
+            assert frame.equals(expected)
+
+    first_equity: dict = first.equity(2, n_samples=2000, seed=1, cache=False)
+    second_equity: dict = second.equity(2, n_samples=2000, seed=1, cache=False)
+    assert first_equity["win"] == second_equity["win"]
+    assert first_equity["equity"] == second_equity["equity"]
+
+
+def test_at_most_five_community_cards():
+    table: Table = make_table("AS KD", "QS 7H 2D 9C KH")
+    with pytest.raises(ValueError):
+        table.add_community(Card("3", "C"))
+    with pytest.raises(ValueError):
+        make_table("AS KD", "QS 7H 2D").draw_community(3)
+
+
+def test_next_cards_outs():
+    table: Table = make_table("AS KD", "QS 7H 2D")
+    breakdown = table.next_cards(1, n_samples=2000, seed=1)
+    assert len(breakdown) == 47
+    # Pairing the board improves every hand alike, so only pairing the
+    # player's cards is an out
+    assert sorted(breakdown.loc[breakdown["Out"], "Card"]) == ["AC", "AD", "AH", "KC", "KH", "KS"]
+    assert breakdown["Win"].is_monotonic_decreasing
+
+    table.add_community(Card("J", "C"))
+    breakdown = table.next_cards(1, n_samples=2000, seed=1)
+    outs: list[str] = sorted(breakdown.loc[breakdown["Out"], "Card"])
+    assert {"TC", "TD", "TH", "TS"} <= set(outs) and "7S" not in outs
+
+
+def test_next_cards_fills_the_cache():
+    table: Table = make_table("AS KD", "QS 7H 2D")
+    breakdowns: dict = table.next_cards([2, 4], n_samples=2000, seed=1)
+    assert set(breakdowns) == {2, 4}
+    row = breakdowns[2].set_index("Card").loc["JC"]
+    table.add_community(Card("J", "C"))
+    hits: int = Table.result_cache.hits
+    outcome: dict = table.outcome_probabilities([2, 4], n_samples=2000, seed=1)[2]
+    assert Table.result_cache.hits == hits + 1
+    assert (outcome["win"], outcome["tie"], outcome["loss"]) == (row["Win"], row["Tie"], row["Loss"])